@@ -0,0 +1,253 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Offline benchmarks of bsdl commands on synthetic installations."""
+
+import dataclasses
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from bsdl.beatsaver import BeatSaverApi
+from bsdl.cli.cmd import CliCommands
+
+from .install import InstallSpec, add_spec_arguments, generate_install, \
+    get_spec
+
+MIN_REGRESSION = 0.005  # Seconds a slowdown must exceed to be flagged
+
+
+def _get_removed_levels(spec: InstallSpec) -> List[str]:
+    """Return keys of ten levels spread over the installation."""
+    step = max(1, spec.levels // 10)
+    return [spec.get_level_key(idx) for idx in range(0, spec.levels, step)]
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hard link level and playlist files, copy all other files."""
+    if os.path.splitext(src)[1] in (".dat", ".bplist"):
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+BENCHMARKS: Dict[str, Callable[[CliCommands, InstallSpec], None]] = {
+    "lvl list": lambda cmd, spec: cmd.lvl_list(False),
+    "lvl list -c": lambda cmd, spec: cmd.lvl_list(True),
+    "bpl list": lambda cmd, spec: cmd.bpl_list(False),
+    "bpl sync": lambda cmd, spec: cmd.bpl_lvl_sync(False),
+    "bpl rm": lambda cmd, spec: cmd.bpl_remove(
+        [spec.get_playlist_key(0)], "keys", False
+    ),
+    "lvl rm": lambda cmd, spec: cmd.lvl_remove(
+        _get_removed_levels(spec), "keys", False
+    ),
+}
+
+
+class BenchmarkRunner:  # pylint: disable=too-many-instance-attributes
+    """Runner timing commands on fresh copies of an installation.
+
+    Every command runs on a copy without a library index (cold) and on
+    a copy with an index that is up to date (warm). Copies are made at
+    the same path, as the index refers to absolute paths.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, workdir: Path, spec: InstallSpec, repeat: int = 5,
+        jobs: int = 1, scan_threads: int = 0
+    ) -> None:
+        """Create runner keeping installations in workdir."""
+        self.spec = spec
+        self.repeat = repeat
+        self.jobs = jobs
+        self.scan_threads = scan_threads
+        self.template = workdir / "template"
+        self.warm_template = workdir / "warm"
+        self.install = workdir / "install"
+        self.log = logging.getLogger("bsdl-bench")
+        self.log.addHandler(logging.NullHandler())
+        self.log.propagate = False
+
+    def setup(self) -> None:
+        """Generate installation and its warm copy with an index."""
+        generate_install(self.template, self.spec)
+        self._reset(self.template)
+        self._time(BENCHMARKS["lvl list -c"])
+        shutil.copytree(self.install, self.warm_template)
+
+    def run(self, name: str) -> Dict[str, List[float]]:
+        """Return seconds of all cold and warm runs of a benchmark."""
+        times = {}
+        for state, template in (
+            ("cold", self.template), ("warm", self.warm_template)
+        ):
+            times[f"{name} ({state})"] = []
+            for _ in range(self.repeat):
+                self._reset(template)
+                times[f"{name} ({state})"].append(
+                    self._time(BENCHMARKS[name])
+                )
+        return times
+
+    def _reset(self, template: Path) -> None:
+        """Replace installation with a copy of template.
+
+        Level and playlist files are hard linked, commands only ever
+        unlink them. Other files like the index are copied.
+        """
+        shutil.rmtree(self.install, ignore_errors=True)
+        shutil.copytree(template, self.install, copy_function=_link_or_copy)
+
+    def _time(
+        self, bench: Callable[[CliCommands, InstallSpec], None]
+    ) -> float:
+        """Return seconds a command took, including its setup.
+
+        The command gets an API handler of its own, which must not
+        have sent any request afterwards.
+        """
+        api = BeatSaverApi()
+        start = time.perf_counter()
+        cmd = CliCommands(
+            self.install, self.log, self.jobs, api=api,
+            scan_threads=self.scan_threads
+        )
+        with open(os.devnull, "w", encoding="utf-8") as devnull, \
+                redirect_stdout(devnull):
+            bench(cmd, self.spec)
+        elapsed = time.perf_counter() - start
+        if cmd.index is not None:
+            cmd.index.close()
+        if api.limiters:
+            raise RuntimeError("benchmark sent requests to BeatSaver")
+        return elapsed
+
+
+def get_regressions(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Return names of results slower than baseline beyond threshold."""
+    return [
+        name for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + threshold)
+        and seconds - baseline[name] > MIN_REGRESSION
+    ]
+
+
+def load_baseline(path: Path, options: Dict[str, Any]) -> Dict[str, float]:
+    """Return baseline results if they were taken with same options."""
+    try:
+        saved = json.loads(path.read_text("utf-8"))
+    except FileNotFoundError:
+        return {}
+    if saved.get("options") != options:
+        print(f"Ignoring baseline taken with other options: {path}")
+        return {}
+    return saved["results"]
+
+
+def print_results(
+    results: Dict[str, List[float]], baseline: Dict[str, float],
+    regressions: List[str]
+) -> None:
+    """Print table with best and median time of every benchmark.
+
+    Best times are compared with the baseline, as noise only ever adds
+    to the time a command takes.
+    """
+    row = "| {:20} | {:>8} | {:>8} | {:>8} | {:>7} | {:10} |"
+    print(row.format("BENCHMARK", "BEST", "MEDIAN", "BASELINE", "CHANGE", ""))
+    for name, times in results.items():
+        best = min(times)
+        base: Optional[float] = baseline.get(name)
+        print(row.format(
+            name, f"{best:.3f}s", f"{statistics.median(times):.3f}s",
+            "" if base is None else f"{base:.3f}s",
+            "" if not base else f"{best / base - 1:+.0%}",
+            "REGRESSION" if name in regressions else ""
+        ))
+
+
+def main() -> None:
+    """Run benchmarks and compare them against the baseline file."""
+    parser = ArgumentParser(description=__doc__)
+    add_spec_arguments(parser)
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="runs per benchmark (default 5)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="bsdl --jobs (default 1)"
+    )
+    parser.add_argument(
+        "--scan-threads", type=int, default=0,
+        help="bsdl --scan-threads (default 0)"
+    )
+    parser.add_argument(
+        "--bench", action="append", choices=BENCHMARKS.keys(),
+        help="benchmark to run, can be given several times (default all)"
+    )
+    parser.add_argument("--baseline", type=Path, help="baseline json file")
+    parser.add_argument(
+        "--save", action="store_true", help="store results as baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="slowdown flagged as regression (default 0.2 = 20%%)"
+    )
+    parser.add_argument("--workdir", type=Path, help="directory to run in")
+    args = parser.parse_args()
+    if args.save and args.baseline is None:
+        parser.error("--save requires --baseline")
+    spec = get_spec(args)
+    options = {
+        **dataclasses.asdict(spec), "jobs": args.jobs,
+        "scan_threads": args.scan_threads
+    }
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        runner = BenchmarkRunner(
+            Path(workdir), spec, args.repeat, args.jobs, args.scan_threads
+        )
+        runner.setup()
+        results = {}
+        for name in args.bench or BENCHMARKS:
+            results.update(runner.run(name))
+    best = {name: min(times) for name, times in results.items()}
+    baseline = {}
+    if args.baseline is not None:
+        baseline = load_baseline(args.baseline, options)
+    regressions = get_regressions(best, baseline, args.threshold)
+    print_results(results, baseline, regressions)
+    if args.save:
+        args.baseline.write_text(json.dumps(
+            {"options": options, "results": best}, indent=2
+        ), "utf-8")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
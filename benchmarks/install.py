@@ -0,0 +1,161 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Synthetic Beat Saber installations for benchmarking bsdl."""
+
+import base64
+import dataclasses
+import json
+import os
+import random
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import List
+
+from bsdl.core.utils import get_level_hash, get_windows_filename
+from bsdl.local import BeatSaberManager
+
+MTIME_NS = 1_600_000_000 * 10 ** 9  # Fixed mtime of all generated files
+
+
+@dataclasses.dataclass(repr=True)
+class InstallSpec:
+    """Size and shape of a synthetic installation.
+
+    Every playlist lists songs consecutive levels and shares the given
+    fraction of them with the next playlist. With an overlap of 0 the
+    playlists share no songs, with 1 all of them list the same songs.
+    """
+
+    levels: int = 5000
+    playlists: int = 300
+    songs: int = 100
+    overlap: float = 0.5
+    image_kb: int = 64
+    seed: int = 0
+
+    def get_level_key(self, index: int) -> str:
+        """Return BeatSaver key of the level with given index."""
+        return format(index + 0x1000, "x")
+
+    def get_playlist_key(self, index: int) -> str:
+        """Return BeatSaver key of the playlist with given index."""
+        return str(index + 1)
+
+    def get_playlist_levels(self, index: int) -> List[int]:
+        """Return indexes of the levels listed in a playlist."""
+        if not self.levels:
+            return []
+        start = int(index * self.songs * (1 - self.overlap))
+        return [
+            (start + song) % self.levels
+            for song in range(min(self.songs, self.levels))
+        ]
+
+
+def generate_install(directory: Path, spec: InstallSpec) -> Path:
+    """Create installation of given spec in an empty directory.
+
+    Levels hold a minimal Info.dat and one difficulty, playlists hold
+    a random cover image of image_kb KiB and the real level hashes. The
+    mtime of all files is fixed, so copies of the installation are
+    indexed the same way.
+    """
+    mgr = BeatSaberManager(directory, use_index=False)
+    rnd = random.Random(spec.seed)  # nosec
+    hashes = [
+        _write_level(mgr.custom_lvl_dir, spec.get_level_key(idx))
+        for idx in range(spec.levels)
+    ]
+    image = base64.b64encode(rnd.randbytes(spec.image_kb * 768)).decode()
+    for idx in range(spec.playlists):
+        key = spec.get_playlist_key(idx)
+        bplist = {
+            "playlistTitle": f"Playlist {key}",
+            "playlistAuthor": "bsdl-bench",
+            "playlistDescription": f"Synthetic playlist {key}",
+            "image": f"data:image/png;base64,{image}",
+            "customData": {
+                "syncURL": f"https://api.beatsaver.com/playlists/id/{key}"
+                "/download"
+            },
+            "songs": [
+                {
+                    "key": spec.get_level_key(lvl),
+                    "hash": hashes[lvl],
+                    "songName": f"Song {spec.get_level_key(lvl)}"
+                } for lvl in spec.get_playlist_levels(idx)
+            ]
+        }
+        filename = get_windows_filename(f"beatsaver-{key}.bplist")
+        (mgr.bpl_dir / filename).write_text(json.dumps(bplist), "utf-8")
+    for root, dirs, files in os.walk(directory, topdown=False):
+        for name in files + dirs:
+            os.utime(Path(root) / name, ns=(MTIME_NS, MTIME_NS))
+    return directory
+
+
+def _write_level(lvl_dir: Path, key: str) -> str:
+    """Write level files for key and return the level hash."""
+    files = {
+        "Info.dat": json.dumps({
+            "_songName": f"Song {key}",
+            "_levelAuthorName": "bsdl-bench",
+            "_difficultyBeatmapSets": [{
+                "_beatmapCharacteristicName": "Standard",
+                "_difficultyBeatmaps": [{
+                    "_difficulty": "Easy", "_beatmapFilename": "Easy.dat"
+                }]
+            }]
+        }).encode(),
+        "Easy.dat": json.dumps({
+            "_notes": [{"_time": beat, "_lineIndex": beat % 4}
+                       for beat in range(16)]
+        }).encode()
+    }
+    directory = lvl_dir / f"{key} (Song {key} - bsdl-bench)"
+    directory.mkdir()
+    for name, content in files.items():
+        (directory / name).write_bytes(content)
+    return get_level_hash(files.__getitem__)
+
+
+def add_spec_arguments(parser: ArgumentParser) -> None:
+    """Add an option to parser for every field of the install spec."""
+    for field in dataclasses.fields(InstallSpec):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}", type=field.type,
+            default=field.default, help=f"defaults to {field.default}"
+        )
+
+
+def get_spec(args: Namespace) -> InstallSpec:
+    """Return install spec from parsed command line arguments."""
+    return InstallSpec(**{
+        field.name: getattr(args, field.name)
+        for field in dataclasses.fields(InstallSpec)
+    })
+
+
+def main() -> None:
+    """Generate an installation from command line arguments."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("directory", type=Path, help="empty target dir")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    generate_install(args.directory, get_spec(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -13,81 +13,448 @@
 
 """Beatsaver API functionality for beatsaber-playlist-manager."""
 
-from io import BytesIO
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, \
+    Tuple, Union
 from urllib.parse import urlsplit
-from zipfile import BadZipFile, ZipFile
+from zipfile import BadZipFile, ZipFile, is_zipfile
 
 import requests
 
-from .core.exceptions import BeatSaverApiError, ModelError
-from .core.models import BsPlaylist, BsMap
+from requests.adapters import HTTPAdapter
 
+from .cache import ResponseCache, ZipStore
+from .core.exceptions import BeatSaverApiError, BeatSaverConnectionError, \
+    BeatSaverNotFoundError, ModelError
+from .core.models import BsPlaylist, BsMap, HttpValidators, PlaylistItem
+from .core.ratelimit import RateLimiter, parse_retry_after
+from .core.utils import get_level_hash
 
-class BeatSaverApi:
-    """Container for methods interacting with the BeatSaver API."""
+Headers = Union[None, Dict[str, str], Callable[[], Dict[str, str]]]
+
+
+class FinishedDownload(io.BufferedReader):
+    """Finished partial download read as level content.
+
+    The file is deleted once it is closed, e.g. after the level was
+    extracted from it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open file at path for reading."""
+        super().__init__(io.FileIO(path, "r"))
+        self.path = path
+
+    def close(self) -> None:
+        """Close and delete the file."""
+        try:
+            super().close()
+        finally:
+            try:
+                self.path.unlink(missing_ok=True)
+            except OSError:
+                pass  # Left for the next download of the level
 
-    def __init__(self) -> None:
-        """Create the API handler."""
+
+class BeatSaverApiBase:  # pylint: disable=too-many-instance-attributes
+    """Base for BeatSaver API clients independent of HTTP transport."""
+
+    def __init__(
+        self, timeout: Tuple[float, float] = (5.0, 30.0),
+        retries: int = 3, backoff: float = 0.5,
+        cache: Optional[ResponseCache] = None
+    ) -> None:
+        """Set urls, timeout, retry and cache parameters of the client.
+
+        The timeout is a tuple of connect and read timeout in seconds.
+        Failed requests are retried after an exponential backoff with
+        jitter. Level metadata and playlists are read from the cache
+        while they are younger than their time to live in seconds. Map
+        zips are read from the zip store if one is set.
+
+        Requests to each host share a rate limiter that slows down when
+        the host answers 429 or a server error and waits as long as its
+        Retry-After header says. Requests refused with 429 are retried
+        up to throttle_retries times without using up the retries.
+
+        If memo is set to a dict, responses are remembered in it for the
+        lifetime of the client, so clients shared by several
+        installations fetch every playlist and level only once.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.zip_store: Optional[ZipStore] = None
+        self.memo: Optional[Dict[str, Any]] = None
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.throttle_retries = 10
+        self.song_ttl = 24 * 60 * 60.0
+        self.playlist_ttl = 10 * 60.0
         self.base_url = "https://api.beatsaver.com/"
+        self.cdn_url = "https://eu.cdn.beatsaver.com"
+        self.max_ids_per_request = 50
+        self.chunk_size = 64 * 1024
+        self.spool_size = 1024 * 1024  # Download size kept in memory
         self.valid_netlocs = (
             "beatsaver.com",
             "api.beatsaver.com",
             "eu.cdn.beatsaver.com"
         )
 
-    def get_playlist_by_key(self, key: str) -> BsPlaylist:
-        """Download a playlist referenced by key."""
-        return self.get_playlist_from_url(self._format_playlist_url(key))
+    def get_song_key_from_url(self, url: str) -> str:
+        """Return key of custom level referenced by url."""
+        api_url = urlsplit(self.get_valid_beatsaber_url(url))
+        try:
+            kind, ident, key = api_url.path.strip("/").split("/")
+        except ValueError as exc:
+            raise BeatSaverApiError("url is not a level url: " + url) from exc
+        if (kind, ident) != ("maps", "id"):
+            raise BeatSaverApiError("url is not a level url: " + url)
+        return key
 
-    def get_playlist_from_url(self, url: str) -> BsPlaylist:
-        """Download a playlist referenced by url."""
-        response = self._get_beatsaver_url(url)
+    def get_playlist_url(self, key: str) -> str:
+        """Return API download url of playlist referenced by key."""
+        return self._format_playlist_url(key)
+
+    def _chunk_keys(self, keys: Iterable[str]) -> List[List[str]]:
+        """Return unique keys split into chunks of multi-id requests."""
+        keys = list(dict.fromkeys(keys))
+        return [
+            keys[idx:idx + self.max_ids_per_request]
+            for idx in range(0, len(keys), self.max_ids_per_request)
+        ]
+
+    def _get_backoff(self, attempt: int) -> float:
+        """Return seconds to wait before retrying failed attempt."""
+        return random.uniform(0, self.backoff * 2 ** attempt)  # nosec
+
+    def _get_limiter(self, url: str) -> RateLimiter:
+        """Return rate limiter shared by the requests to host of url."""
+        netloc = urlsplit(url).netloc
+        if (limiter := self.limiters.get(netloc)) is None:
+            limiter = self.limiters.setdefault(netloc, RateLimiter())
+        return limiter
+
+    def _update_limiter(
+        self, limiter: RateLimiter, status: int, retry_after: Optional[str]
+    ) -> None:
+        """Adapt rate limit of a host to the status of its response.
+
+        A 429 without Retry-After header pauses the host for backoff
+        seconds.
+        """
+        if status == 429:
+            limiter.throttle(parse_retry_after(retry_after) or self.backoff)
+        elif status >= 500:
+            limiter.throttle(parse_retry_after(retry_after))
+        else:
+            limiter.succeed()
+
+    def _get_cached(self, url: str, ttl: float) -> Optional[bytes]:
+        """Return remembered or cached response content of url."""
+        if ttl <= 0:
+            return None
+        if (content := self._get_memo(url)) is not None:
+            return content
+        if self.cache is None:
+            return None
+        return self.cache.get(url, ttl)
+
+    def _put_cached(self, url: str, content: bytes, ttl: float) -> None:
+        """Remember and cache response content of url if it expires."""
+        if ttl <= 0:
+            return
+        self._put_memo(url, content)
+        if self.cache is not None:
+            self.cache.put(url, content)
+
+    def _get_memo(self, key: str) -> Any:
+        """Return value remembered for key, or None."""
+        if self.memo is None:
+            return None
+        return self.memo.get(key)
+
+    def _put_memo(self, key: str, value: Any) -> None:
+        """Remember value for key if responses are remembered."""
+        if self.memo is not None:
+            self.memo[key] = value
+
+    def _get_stale(self, url: str, exc: BeatSaverApiError) -> bytes:
+        """Return expired response content of url, else raise exc.
+
+        Only responses of requests that failed because BeatSaver can't
+        be reached are replaced by expired content.
+        """
+        if self.cache is None or not isinstance(exc, BeatSaverConnectionError):
+            raise exc
+        content = self.cache.get_stale(url)
+        if content is None:
+            raise exc
+        return content
+
+    def _get_cached_songs(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return cached metadata responses of levels by key."""
+        cached = {}
+        for key in keys:
+            url = self._format_song_url(key)
+            if (content := self._get_cached(url, self.song_ttl)) is not None:
+                cached[key] = content
+        return cached
+
+    def _put_cached_songs(self, keys: List[str], response: bytes) -> None:
+        """Cache metadata of every level of a multi-id response.
+
+        The metadata is cached like the response of a single level, so
+        it is found whichever keys are requested together later.
+        """
+        try:
+            details = self._load_song_details(response)
+        except BeatSaverApiError:
+            return
+        for key in keys:
+            if (detail := details.get(key.lower())) is not None:
+                self._put_cached(
+                    self._format_song_url(key), json.dumps(detail).encode(),
+                    self.song_ttl
+                )
+
+    def _get_stale_songs(
+        self, keys: List[str], exc: BeatSaverApiError
+    ) -> Tuple[List[BsMap], Dict[str, BeatSaverApiError]]:
+        """Return levels with expired metadata and errors of the rest.
+
+        Keys without expired metadata are mapped to exc.
+        """
+        stale = {}
+        for key in keys:
+            try:
+                stale[key] = self._get_stale(self._format_song_url(key), exc)
+            except BeatSaverApiError:
+                pass
+        lvls, errors = self._parse_song_contents(stale)
+        errors.update((key, exc) for key in keys if key not in stale)
+        return lvls, errors
+
+    def _get_stored_map(self, bsmap: BsMap) -> Optional[BsMap]:
+        """Return map with content from the zip store if it has it."""
+        if self.zip_store is None or not bsmap.hash:
+            return None
+        content = self.zip_store.get(bsmap.hash)
+        if content is None:
+            return None
+        try:
+            return self._parse_map_zip(bsmap, content)
+        except BeatSaverApiError:
+            self.zip_store.remove(bsmap.hash)
+            return None
+
+    def _store_map(self, bsmap: BsMap) -> None:
+        """Put downloaded zip content of map into the zip store."""
+        if self.zip_store is not None and bsmap.hash and bsmap.content:
+            self.zip_store.put(bsmap.hash, bsmap.content)
+
+    @staticmethod
+    def _open_part(part_path: Path) -> IO[bytes]:
+        """Return partial download file opened for appending."""
+        try:
+            # pylint: disable-next=consider-using-with
+            return open(part_path, "ab+")
+        except OSError as exc:
+            err_msg = f"can't open partial download: {exc.args[0]}"
+            raise BeatSaverApiError(err_msg) from exc
+
+    @staticmethod
+    def _get_range_headers(part: IO[bytes]) -> Dict[str, str]:
+        """Return headers requesting the rest of a partial download."""
+        part.flush()
+        size = os.fstat(part.fileno()).st_size
+        return {"Range": f"bytes={size}-"} if size else {}
+
+    @staticmethod
+    def _prepare_part(
+        part: IO[bytes], status: int, content_range: Optional[str]
+    ) -> None:
+        """Truncate partial download unless response continues it."""
+        part.flush()
+        size = os.fstat(part.fileno()).st_size
+        if status == 206 and size:
+            if (content_range or "").startswith(f"bytes {size}-"):
+                return
+            part.truncate(0)
+            raise BeatSaverApiError("response doesn't continue download")
+        part.truncate(0)
+
+    @staticmethod
+    def _is_complete_zip(part: IO[bytes]) -> bool:
+        """Return true if partial download already is a whole zip."""
+        part.flush()
+        return os.fstat(part.fileno()).st_size > 0 and is_zipfile(part)
+
+    def _finish_part(
+        self, bsmap: BsMap, part: IO[bytes], part_path: Path
+    ) -> BsMap:
+        """Return map with content of finished partial download.
+
+        The partial download is opened again for reading as content of
+        the map, which deletes it once closed. Its zip is checked
+        against the hash of the map.
+        """
+        part.close()
+        try:
+            content = FinishedDownload(part_path)
+        except OSError as exc:
+            err_msg = f"can't open partial download: {exc.args[0]}"
+            raise BeatSaverApiError(err_msg) from exc
+        bsmap = self._parse_map_zip(bsmap, content)
+        self._verify_map_hash(bsmap)
+        return bsmap
+
+    @staticmethod
+    def _verify_map_hash(bsmap: BsMap) -> None:
+        """Raise an error if the zip content doesn't match map hash."""
+        if not bsmap.hash:
+            return
+        try:
+            with ZipFile(bsmap.content) as lvl_zip:
+                names = {name.lower(): name for name in lvl_zip.namelist()}
+                lvl_hash = get_level_hash(
+                    lambda name: lvl_zip.read(names[name.lower()])
+                )
+        except (BadZipFile, ModelError) as exc:
+            bsmap.content.close()
+            raise BeatSaverApiError(f"level data invalid: {exc}") from exc
+        bsmap.content.seek(0)
+        if lvl_hash is not None and lvl_hash != bsmap.hash.lower():
+            bsmap.content.close()
+            raise BeatSaverApiError("level data doesn't match level hash")
+
+    @staticmethod
+    def _make_api_error(
+        url: str, status: Optional[int] = None,
+        timed_out: bool = False, unreachable: bool = False
+    ) -> BeatSaverApiError:
+        """Return API error describing why a request to url failed.
+
+        The status is the HTTP status of an error response.
+        """
+        if status == 404:
+            return BeatSaverNotFoundError(
+                "can't find item on BeatSaver: " + url
+            )
+        if status == 429:
+            return BeatSaverConnectionError(
+                "too many requests to BeatSaver: " + url
+            )
+        if status is not None:
+            return BeatSaverApiError("invalid response from BeatSaver: " + url)
+        if timed_out:
+            return BeatSaverConnectionError(
+                "connection to BeatSaver timed out: " + url
+            )
+        if unreachable:
+            return BeatSaverConnectionError(
+                "can't connect to BeatSaver: " + url
+            )
+        return BeatSaverApiError(
+            "an unexpected error occurred connecting to BeatSaver: " + url
+        )
+
+    def _get_cdn_map(self, item: PlaylistItem) -> BsMap:
+        """Return map of playlist song with its CDN download url."""
+        if not item.hash:
+            raise BeatSaverNotFoundError(f"playlist song has no hash: {item}")
+        return BsMap.from_playlist_item(item, self._format_cdn_url(item.hash))
+
+    @staticmethod
+    def _parse_playlist(response: bytes) -> BsPlaylist:
+        """Return playlist constructed from response content."""
         try:
-            bplist = BsPlaylist.from_json(response)
-            return bplist
+            return BsPlaylist.from_json(response)
         except ModelError as exc:
             raise BeatSaverApiError(f"playlist data invalid: {exc}") from exc
 
-    def get_song_by_key(self, key: str) -> BsMap:
-        """Download the metadata of a custom level referenced by key."""
-        return self.get_song_from_url(self._format_song_url(key))
-
-    def get_song_from_url(self, url: str) -> BsMap:
-        """Download the metadata of a custom level referenced by url."""
-        response = self._get_beatsaver_url(url)
+    @staticmethod
+    def _parse_song(response: bytes) -> BsMap:
+        """Return level metadata constructed from response content."""
         try:
-            lvl = BsMap.from_json(response)
-            return lvl
+            return BsMap.from_json(response)
         except ModelError as exc:
             raise BeatSaverApiError(f"level data invalid: {exc}") from exc
 
-    def download_map_from_url(self, bsmap: BsMap) -> BsMap:
-        """Download zipped custom level data referenced by url."""
-        response = self._get_beatsaver_url(bsmap.url)
+    @classmethod
+    def _parse_song_contents(
+        cls, contents: Dict[str, bytes]
+    ) -> Tuple[List[BsMap], Dict[str, BeatSaverApiError]]:
+        """Return levels and per-key errors of responses by key."""
+        lvls: List[BsMap] = []
+        errors: Dict[str, BeatSaverApiError] = {}
+        for key, content in contents.items():
+            try:
+                lvls.append(cls._parse_song(content))
+            except BeatSaverApiError as exc:
+                errors[key] = exc
+        return lvls, errors
+
+    @staticmethod
+    def _load_song_details(response: bytes) -> Dict[str, Any]:
+        """Return level details of a multi-id response by lower key."""
         try:
-            return bsmap.add_content(ZipFile(BytesIO(response)))
-        except BadZipFile as exc:
-            raise BeatSaverApiError("level data is not a valid zip") from exc
+            details = json.loads(response)
+        except json.JSONDecodeError as exc:
+            raise BeatSaverApiError(f"level data invalid: {exc}") from exc
+        if isinstance(details, dict) and "id" in details:
+            details = {details["id"]: details}  # single id response
+        if not isinstance(details, dict):
+            raise BeatSaverApiError("level data invalid: not an object")
+        return {k.lower(): v for k, v in details.items()}
 
-    def _get_beatsaver_url(self, url: str) -> bytes:
-        """Return response content of Beat Saver GET request to url."""
-        url = self.get_valid_beatsaber_url(url)
+    @classmethod
+    def _parse_songs(
+        cls, keys: List[str], response: bytes
+    ) -> Tuple[List[BsMap], Dict[str, BeatSaverApiError]]:
+        """Return levels and per-key errors of a multi-id response."""
+        try:
+            details = cls._load_song_details(response)
+        except BeatSaverApiError as exc:
+            return [], {key: exc for key in keys}
+        lvls: List[BsMap] = []
+        errors: Dict[str, BeatSaverApiError] = {}
+        for key in keys:
+            if details.get(key.lower()) is None:
+                errors[key] = BeatSaverNotFoundError(
+                    "can't find item on BeatSaver: " + key
+                )
+                continue
+            try:
+                lvls.append(BsMap.from_dict(details[key.lower()]))
+            except ModelError as exc:
+                errors[key] = BeatSaverApiError(f"level data invalid: {exc}")
+        return lvls, errors
+
+    def _get_spool(self) -> IO[bytes]:
+        """Return temporary file that moves to disk above spool size."""
+        # pylint: disable-next=consider-using-with
+        return tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+
+    @staticmethod
+    def _parse_map_zip(bsmap: BsMap, content: IO[bytes]) -> BsMap:
+        """Return map with content if it contains a valid zip."""
         try:
-            bsr = requests.get(url)
-            bsr.raise_for_status()
-            return bsr.content
-        except requests.RequestException as exc:
-            if isinstance(exc, requests.HTTPError) and bsr.status_code == 404:
-                err = "can't find item on BeatSaver: "
-            elif isinstance(exc, requests.HTTPError):
-                err = "invalid response from BeatSaver: "
-            elif isinstance(exc, requests.Timeout):
-                err = "connection to BeatSaver timed out: "
-            elif isinstance(exc, requests.ConnectionError):
-                err = "can't connect to BeatSaver: "
-            else:
-                err = "an unexpected error occurred connecting to BeatSaver: "
-            raise BeatSaverApiError(err + url) from exc
+            with ZipFile(content):
+                pass
+        except BadZipFile as exc:
+            content.close()
+            raise BeatSaverApiError("level data is not a valid zip") from exc
+        content.seek(0)
+        return bsmap.add_content(content)
 
     def _format_playlist_url(self, key: str) -> str:
         """Return download url for a playlist referenced by key."""
@@ -97,6 +464,14 @@ class BeatSaverApi:
         """Return download url for a custom level referenced by key."""
         return f"{self.base_url}/maps/id/{key}"
 
+    def _format_cdn_url(self, lvl_hash: str) -> str:
+        """Return CDN zip url for a custom level with given hash."""
+        return f"{self.cdn_url}/{lvl_hash.lower()}.zip"
+
+    def _format_songs_url(self, keys: Iterable[str]) -> str:
+        """Return url for the metadata of custom levels with keys."""
+        return f"{self.base_url}/maps/ids/{','.join(keys)}"
+
     def get_valid_beatsaber_url(self, url: str) -> str:
         """Check url for valid BeatSaver netloc and return API url."""
         split_url = urlsplit(url)
@@ -114,3 +489,275 @@ class BeatSaverApi:
             except ValueError as exc:
                 raise BeatSaverApiError(err_msg) from exc
         raise BeatSaverApiError("url does not point to BeatSaver: " + url)
+
+
+class BeatSaverApi(BeatSaverApiBase):
+    """Container for methods interacting with the BeatSaver API."""
+
+    def __init__(
+        self, pool_size: int = 10,
+        timeout: Tuple[float, float] = (5.0, 30.0),
+        retries: int = 3, backoff: float = 0.5,
+        cache: Optional[ResponseCache] = None
+    ) -> None:
+        """Create the API handler with a pooled HTTP session.
+
+        The pool size limits the kept-alive connections per host.
+        """
+        super().__init__(timeout, retries, backoff, cache)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_playlist_by_key(self, key: str) -> BsPlaylist:
+        """Download a playlist referenced by key."""
+        return self.get_playlist_from_url(self._format_playlist_url(key))
+
+    def get_playlist_from_url(self, url: str) -> BsPlaylist:
+        """Download a playlist referenced by url."""
+        return self._parse_playlist(
+            self._get_beatsaver_url(url, self.playlist_ttl)
+        )
+
+    def get_playlist_if_modified(
+        self, url: str, validators: Optional[HttpValidators] = None
+    ) -> Tuple[Optional[BsPlaylist], HttpValidators]:
+        """Download a playlist referenced by url if it was modified.
+
+        The request is conditional on the validators of an earlier
+        download. If the server answers 304 Not Modified no playlist
+        is returned. The validators of the response are returned too.
+        """
+        url = self.get_valid_beatsaber_url(url)
+        memo_key = "modified:" + url
+        if (response := self._get_memo(memo_key)) is None:
+            headers = validators.get_request_headers() if validators else {}
+            response = self._request(
+                url, self._read_if_modified, headers=headers
+            )
+            if response[0] is not None:
+                self._put_memo(memo_key, response)
+        raw, validators = response
+        if raw is None:
+            return None, validators
+        return self._parse_playlist(raw), validators
+
+    def get_song_by_key(self, key: str) -> BsMap:
+        """Download the metadata of a custom level referenced by key."""
+        return self.get_song_from_url(self._format_song_url(key))
+
+    def get_songs_by_keys(
+        self, keys: Iterable[str]
+    ) -> Tuple[List[BsMap], Dict[str, BeatSaverApiError]]:
+        """Download the metadata of custom levels referenced by keys.
+
+        Levels with cached metadata are served from the cache, the
+        other keys are requested in chunks through the multi-id
+        endpoint. The metadata of every level is cached by its key.
+        Every key that could not be retrieved is mapped to the error
+        that occurred for it.
+        """
+        keys = list(dict.fromkeys(keys))
+        cached = self._get_cached_songs(keys)
+        lvls, errors = self._parse_song_contents(cached)
+        for chunk in self._chunk_keys(k for k in keys if k not in cached):
+            try:
+                response = self._request(
+                    self._format_songs_url(chunk), lambda bsr: bsr.content
+                )
+            except BeatSaverApiError as exc:
+                chunk_lvls, chunk_errors = self._get_stale_songs(chunk, exc)
+                lvls.extend(chunk_lvls)
+                errors.update(chunk_errors)
+                continue
+            self._put_cached_songs(chunk, response)
+            chunk_lvls, chunk_errors = self._parse_songs(chunk, response)
+            lvls.extend(chunk_lvls)
+            errors.update(chunk_errors)
+        return lvls, errors
+
+    def get_song_from_url(self, url: str) -> BsMap:
+        """Download the metadata of a custom level referenced by url."""
+        return self._parse_song(self._get_beatsaver_url(url, self.song_ttl))
+
+    def download_map_from_url(
+        self, bsmap: BsMap, part_path: Optional[Path] = None
+    ) -> BsMap:
+        """Download zipped custom level data referenced by url.
+
+        The data is streamed into a temporary file that only stays in
+        memory while it is smaller than the spool size. Maps with a hash
+        are read from and added to the zip store if one is set.
+
+        If a path for the partial download is given, the data is written
+        to it instead and downloads that were cut off are resumed with
+        Range requests, even in a later run. The finished zip is checked
+        against the hash of the map.
+        """
+        stored = self._get_stored_map(bsmap)
+        if stored is not None:
+            return stored
+        if part_path is not None:
+            bsmap = self._download_part(bsmap, part_path)
+            self._store_map(bsmap)
+            return bsmap
+        content = self._get_spool()
+        try:
+            self._request(
+                bsmap.url, lambda bsr: self._write_chunks(bsr, content), True
+            )
+            bsmap = self._parse_map_zip(bsmap, content)
+            self._store_map(bsmap)
+        except BaseException:
+            content.close()
+            raise
+        return bsmap
+
+    def download_map_by_hash(
+        self, item: PlaylistItem, part_path: Optional[Path] = None
+    ) -> BsMap:
+        """Download zipped custom level data of a playlist song.
+
+        The zip is requested from the BeatSaver CDN using the hash of
+        the song, which doesn't require a metadata request. If the CDN
+        has no zip for the hash BeatSaverNotFoundError is raised.
+        """
+        return self.download_map_from_url(self._get_cdn_map(item), part_path)
+
+    def _download_part(self, bsmap: BsMap, part_path: Path) -> BsMap:
+        """Return map with content downloaded through partial file.
+
+        The partial file is kept if BeatSaver can't be reached and
+        deleted on any other error.
+        """
+        part = self._open_part(part_path)
+        try:
+            if not self._is_complete_zip(part):
+                self._request(
+                    bsmap.url, lambda bsr: self._write_part(bsr, part), True,
+                    lambda: self._get_range_headers(part)
+                )
+        except BeatSaverConnectionError:
+            part.close()
+            raise
+        except BeatSaverApiError:
+            part.close()
+            part_path.unlink(missing_ok=True)
+            raise
+        return self._finish_part(bsmap, part, part_path)
+
+    def _get_beatsaver_url(self, url: str, ttl: float = 0.0) -> bytes:
+        """Return response content of Beat Saver GET request to url.
+
+        Content is served from the cache if it is younger than ttl and
+        while BeatSaver can't be reached.
+        """
+        url = self.get_valid_beatsaber_url(url)
+        if (content := self._get_cached(url, ttl)) is None:
+            try:
+                content = self._request(url, lambda bsr: bsr.content)
+            except BeatSaverApiError as exc:
+                return self._get_stale(url, exc)
+            self._put_cached(url, content, ttl)
+        return content
+
+    def _request(
+        self, url: str, read: Callable[[requests.Response], Any],
+        stream: bool = False, headers: Headers = None
+    ) -> Any:
+        """Return result of reading the response of a GET request.
+
+        Every request waits for the rate limiter of its host. Server
+        errors and dropped connections are retried, waiting a random
+        time of up to backoff * 2^attempt seconds in between. Headers
+        given as function are created again for every attempt.
+        """
+        url = self.get_valid_beatsaber_url(url)
+        limiter = self._get_limiter(url)
+        attempt = throttled = 0
+        while True:
+            time.sleep(limiter.reserve())
+            try:
+                with self.session.get(
+                    url, timeout=self.timeout, stream=stream,
+                    headers=headers() if callable(headers) else headers
+                ) as bsr:
+                    self._update_limiter(
+                        limiter, bsr.status_code,
+                        bsr.headers.get("Retry-After")
+                    )
+                    bsr.raise_for_status()
+                    return read(bsr)
+            except requests.RequestException as exc:
+                if isinstance(exc, requests.Timeout):
+                    limiter.throttle()
+                if self._is_throttled(exc) and (
+                    throttled < self.throttle_retries
+                ):
+                    throttled += 1
+                    continue
+                if attempt < self.retries and self._is_retryable(exc):
+                    time.sleep(self._get_backoff(attempt))
+                    attempt += 1
+                    continue
+                raise self._get_api_error(exc, url) from exc
+
+    @staticmethod
+    def _read_if_modified(
+        bsr: requests.Response
+    ) -> Tuple[Optional[bytes], HttpValidators]:
+        """Return content, or None if not modified, and validators."""
+        validators = HttpValidators.from_headers(bsr.headers)
+        if bsr.status_code == 304:
+            return None, validators
+        return bsr.content, validators
+
+    def _write_part(self, bsr: requests.Response, part: IO[bytes]) -> None:
+        """Append streamed response to partial download or restart."""
+        self._prepare_part(
+            part, bsr.status_code, bsr.headers.get("Content-Range")
+        )
+        for chunk in bsr.iter_content(self.chunk_size):
+            part.write(chunk)
+
+    def _write_chunks(self, bsr: requests.Response, dest: IO[bytes]) -> None:
+        """Write streamed response content to start of destination."""
+        dest.seek(0)
+        dest.truncate()
+        for chunk in bsr.iter_content(self.chunk_size):
+            dest.write(chunk)
+
+    @staticmethod
+    def _is_throttled(exc: requests.RequestException) -> bool:
+        """Return true if the request was refused with 429."""
+        return isinstance(exc, requests.HTTPError) and getattr(
+            exc.response, "status_code", None
+        ) == 429
+
+    @staticmethod
+    def _is_retryable(exc: requests.RequestException) -> bool:
+        """Return true if a failed request should be sent again."""
+        if isinstance(exc, requests.HTTPError):
+            return exc.response is not None and exc.response.status_code >= 500
+        return isinstance(exc, (
+            requests.ConnectionError, requests.exceptions.ChunkedEncodingError
+        ))
+
+    @classmethod
+    def _get_api_error(
+        cls, exc: requests.RequestException, url: str
+    ) -> BeatSaverApiError:
+        """Return API error corresponding to a failed request."""
+        status = None
+        if isinstance(exc, requests.HTTPError):
+            status = getattr(exc.response, "status_code", 0)
+        return cls._make_api_error(
+            url, status, isinstance(exc, requests.Timeout),
+            isinstance(exc, (
+                requests.ConnectionError,
+                requests.exceptions.ChunkedEncodingError
+            ))
+        )
@@ -0,0 +1,334 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Asyncio BeatSaver API functionality for beatsaber-playlist-manager.
+
+Requires the optional dependency aiohttp which can be installed with
+the package extra 'async'.
+"""
+
+# The coroutines mirror the methods of the synchronous client.
+# pylint: disable=duplicate-code
+
+import asyncio
+
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, \
+    Optional, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from .beatsaver import BeatSaverApiBase, Headers
+from .cache import ResponseCache
+from .core.exceptions import BeatSaverApiError, BeatSaverConnectionError
+from .core.models import BsPlaylist, BsMap, HttpValidators, PlaylistItem
+
+
+class AsyncBeatSaverApi(BeatSaverApiBase):
+    """Container for coroutines interacting with the BeatSaver API.
+
+    Use the client as an async context manager to close its session:
+
+        async with AsyncBeatSaverApi() as api:
+            bpl = await api.get_playlist_by_key("1710")
+    """
+
+    def __init__(
+        self, max_concurrency: int = 100,
+        timeout: Tuple[float, float] = (5.0, 30.0),
+        retries: int = 3, backoff: float = 0.5,
+        cache: Optional[ResponseCache] = None
+    ) -> None:
+        """Create the API handler limiting the concurrent requests."""
+        if aiohttp is None:
+            raise BeatSaverApiError(
+                "the asyncio client requires the package aiohttp"
+            )
+        super().__init__(timeout, retries, backoff, cache)
+        self.max_concurrency = max_concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncBeatSaverApi":
+        """Return client after opening its session."""
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close session of the client."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close session and all of its connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_playlist_by_key(self, key: str) -> BsPlaylist:
+        """Download a playlist referenced by key."""
+        return await self.get_playlist_from_url(
+            self._format_playlist_url(key)
+        )
+
+    async def get_playlist_from_url(self, url: str) -> BsPlaylist:
+        """Download a playlist referenced by url."""
+        return self._parse_playlist(
+            await self._get_beatsaver_url(url, self.playlist_ttl)
+        )
+
+    async def get_playlist_if_modified(
+        self, url: str, validators: Optional[HttpValidators] = None
+    ) -> Tuple[Optional[BsPlaylist], HttpValidators]:
+        """Download a playlist referenced by url if it was modified.
+
+        Behaves like the method of BeatSaverApi with the same name.
+        """
+        async def read_if_modified(
+            bsr: "aiohttp.ClientResponse"
+        ) -> Tuple[Optional[bytes], HttpValidators]:
+            response_validators = HttpValidators.from_headers(bsr.headers)
+            if bsr.status == 304:
+                return None, response_validators
+            return await bsr.read(), response_validators
+
+        url = self.get_valid_beatsaber_url(url)
+        memo_key = "modified:" + url
+        if (response := self._get_memo(memo_key)) is None:
+            headers = validators.get_request_headers() if validators else {}
+            response = await self._request(url, read_if_modified, headers)
+            if response[0] is not None:
+                self._put_memo(memo_key, response)
+        raw, validators = response
+        if raw is None:
+            return None, validators
+        return self._parse_playlist(raw), validators
+
+    async def get_song_by_key(self, key: str) -> BsMap:
+        """Download the metadata of a custom level referenced by key."""
+        return await self.get_song_from_url(self._format_song_url(key))
+
+    async def get_songs_by_keys(
+        self, keys: Iterable[str]
+    ) -> Tuple[List[BsMap], Dict[str, BeatSaverApiError]]:
+        """Download the metadata of custom levels referenced by keys.
+
+        The cache is used like by BeatSaverApi and all chunks of the
+        multi-id endpoint are requested concurrently. Every key that
+        could not be retrieved is mapped to the error that occurred for
+        it.
+        """
+        keys = list(dict.fromkeys(keys))
+        cached = await asyncio.to_thread(self._get_cached_songs, keys)
+        lvls, errors = self._parse_song_contents(cached)
+        chunks = self._chunk_keys(k for k in keys if k not in cached)
+        responses = await asyncio.gather(*(
+            self._request(
+                self._format_songs_url(chunk), lambda bsr: bsr.read()
+            )
+            for chunk in chunks
+        ), return_exceptions=True)
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, BeatSaverApiError):
+                chunk_lvls, chunk_errors = await asyncio.to_thread(
+                    self._get_stale_songs, chunk, response
+                )
+            elif isinstance(response, BaseException):
+                raise response
+            else:
+                await asyncio.to_thread(
+                    self._put_cached_songs, chunk, response
+                )
+                chunk_lvls, chunk_errors = self._parse_songs(chunk, response)
+            lvls.extend(chunk_lvls)
+            errors.update(chunk_errors)
+        return lvls, errors
+
+    async def get_song_from_url(self, url: str) -> BsMap:
+        """Download the metadata of a custom level referenced by url."""
+        return self._parse_song(
+            await self._get_beatsaver_url(url, self.song_ttl)
+        )
+
+    async def download_map_from_url(
+        self, bsmap: BsMap, part_path: Optional[Path] = None
+    ) -> BsMap:
+        """Download zipped custom level data referenced by url.
+
+        The data is streamed into a temporary file that only stays in
+        memory while it is smaller than the spool size. The zip store
+        and partial downloads are used like the ones of BeatSaverApi,
+        in worker threads to not block the event loop.
+        """
+        stored = await asyncio.to_thread(self._get_stored_map, bsmap)
+        if stored is not None:
+            return stored
+        if part_path is not None:
+            bsmap = await self._download_part(bsmap, part_path)
+            await asyncio.to_thread(self._store_map, bsmap)
+            return bsmap
+        content = self._get_spool()
+
+        async def write_chunks(bsr: "aiohttp.ClientResponse") -> None:
+            content.seek(0)
+            content.truncate()
+            async for chunk in bsr.content.iter_chunked(self.chunk_size):
+                content.write(chunk)
+
+        try:
+            await self._request(bsmap.url, write_chunks)
+            bsmap = self._parse_map_zip(bsmap, content)
+            await asyncio.to_thread(self._store_map, bsmap)
+        except BaseException:
+            content.close()
+            raise
+        return bsmap
+
+    async def download_map_by_hash(
+        self, item: PlaylistItem, part_path: Optional[Path] = None
+    ) -> BsMap:
+        """Download zipped custom level data of a playlist song."""
+        return await self.download_map_from_url(
+            self._get_cdn_map(item), part_path
+        )
+
+    async def _download_part(self, bsmap: BsMap, part_path: Path) -> BsMap:
+        """Return map with content downloaded through partial file."""
+        part = self._open_part(part_path)
+
+        async def write_part(bsr: "aiohttp.ClientResponse") -> None:
+            self._prepare_part(
+                part, bsr.status, bsr.headers.get("Content-Range")
+            )
+            async for chunk in bsr.content.iter_chunked(self.chunk_size):
+                part.write(chunk)
+
+        try:
+            if not self._is_complete_zip(part):
+                await self._request(
+                    bsmap.url, write_part,
+                    lambda: self._get_range_headers(part)
+                )
+        except BeatSaverConnectionError:
+            part.close()
+            raise
+        except BeatSaverApiError:
+            part.close()
+            part_path.unlink(missing_ok=True)
+            raise
+        return await asyncio.to_thread(
+            self._finish_part, bsmap, part, part_path
+        )
+
+    async def _get_beatsaver_url(self, url: str, ttl: float = 0.0) -> bytes:
+        """Return response content of Beat Saver GET request to url.
+
+        The cache is used like the one of BeatSaverApi, its database is
+        accessed in worker threads to not block the event loop.
+        """
+        url = self.get_valid_beatsaber_url(url)
+        content = await asyncio.to_thread(self._get_cached, url, ttl)
+        if content is None:
+            try:
+                content = await self._request(url, lambda bsr: bsr.read())
+            except BeatSaverApiError as exc:
+                return await asyncio.to_thread(self._get_stale, url, exc)
+            await asyncio.to_thread(self._put_cached, url, content, ttl)
+        return content
+
+    async def _request(
+        self, url: str,
+        read: Callable[["aiohttp.ClientResponse"], Awaitable[Any]],
+        headers: Headers = None
+    ) -> Any:
+        """Return result of reading the response of a GET request.
+
+        At most max_concurrency requests of the client are sent at the
+        same time. Rate limits, retries and headers behave like the ones
+        of BeatSaverApi.
+        """
+        url = self.get_valid_beatsaber_url(url)
+        session = self._get_session()
+        limiter = self._get_limiter(url)
+        attempt = throttled = 0
+        while True:
+            await asyncio.sleep(limiter.reserve())
+            try:
+                async with self._semaphore:
+                    async with session.get(
+                        url,
+                        headers=headers() if callable(headers) else headers
+                    ) as bsr:
+                        self._update_limiter(
+                            limiter, bsr.status,
+                            bsr.headers.get("Retry-After")
+                        )
+                        bsr.raise_for_status()
+                        return await read(bsr)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                if isinstance(exc, asyncio.TimeoutError):
+                    limiter.throttle()
+                if self._is_throttled(exc) and (
+                    throttled < self.throttle_retries
+                ):
+                    throttled += 1
+                    continue
+                if attempt < self.retries and self._is_retryable(exc):
+                    await asyncio.sleep(self._get_backoff(attempt))
+                    attempt += 1
+                    continue
+                raise self._get_api_error(exc, url) from exc
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Return session of the client, creating it if necessary."""
+        if self._session is None or self._session.closed:
+            connect, read = self.timeout
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect, sock_read=read
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    @staticmethod
+    def _is_throttled(exc: Exception) -> bool:
+        """Return true if the request was refused with 429."""
+        return isinstance(exc, aiohttp.ClientResponseError) and (
+            exc.status == 429
+        )
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        """Return true if a failed request should be sent again."""
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status >= 500
+        return isinstance(exc, (
+            aiohttp.ClientConnectionError, aiohttp.ClientPayloadError
+        ))
+
+    @classmethod
+    def _get_api_error(cls, exc: Exception, url: str) -> BeatSaverApiError:
+        """Return API error corresponding to a failed request."""
+        status = None
+        if isinstance(exc, aiohttp.ClientResponseError):
+            status = exc.status
+        return cls._make_api_error(
+            url, status, isinstance(exc, asyncio.TimeoutError),
+            isinstance(exc, (
+                aiohttp.ClientConnectionError, aiohttp.ClientPayloadError
+            ))
+        )
@@ -0,0 +1,307 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Persistent caches for beatsaber-playlist-manager."""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Tuple
+
+from .core.database import Database
+from .core.utils import is_level_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored REAL NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used ON responses (used);
+"""
+
+
+class ResponseCache(Database):
+    """SQLite cache of BeatSaver API responses keyed by url.
+
+    Entries expire after the time to live given when reading them. The
+    total size of the cached content is kept below max_size by evicting
+    the least recently used entries. Expired entries are kept until they
+    are evicted, so they can be served while BeatSaver is unreachable.
+    The use times of cache hits are written with the next put or when
+    the cache is closed, so hits don't cost a write transaction each.
+    The total size is summed up with the first put and then kept up to
+    date, it is only summed up again to evict entries.
+    """
+
+    schema = SCHEMA
+    schema_version = 1
+
+    def __init__(self, path: Path, max_size: int = 64 * 1024 * 1024) -> None:
+        """Open cache database at path with a size cap in bytes."""
+        super().__init__(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._used: Dict[str, float] = {}
+        self._total: Optional[int] = None
+
+    def get(self, url: str, ttl: float) -> Optional[bytes]:
+        """Return content cached for url if it is younger than ttl."""
+        content = self._get(url, time.time() - ttl)
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return content
+
+    def get_stale(self, url: str) -> Optional[bytes]:
+        """Return content cached for url regardless of its age."""
+        content = self._get(url, None)
+        if content is not None:
+            with self._lock:
+                self.stale_hits += 1
+        return content
+
+    def close(self) -> None:
+        """Write pending use times and close the database connection."""
+        try:
+            with self._lock, self._db:
+                self._write_used()
+        except sqlite3.Error:
+            pass
+        super().close()
+
+    def put(self, url: str, content: bytes) -> None:
+        """Cache content for url and evict entries above size cap."""
+        if len(content) > self.max_size:
+            return
+        now = time.time()
+        try:
+            with self._lock, self._db:
+                row = self._db.execute(
+                    "SELECT size FROM responses WHERE url = ?", (url,)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (url, content, len(content), now, now)
+                )
+                self._write_used()
+                self._add_size(len(content) - (row[0] if row else 0))
+        except sqlite3.Error:
+            pass  # Failing to cache a response must not fail the request
+
+    def _get(self, url: str, min_stored: Optional[float]) -> Optional[bytes]:
+        """Return content for url stored after min_stored if any."""
+        try:
+            with self._lock, self._db:
+                row = self._db.execute(
+                    "SELECT content, stored FROM responses WHERE url = ?",
+                    (url,)
+                ).fetchone()
+                if row is None or (
+                    min_stored is not None and row[1] < min_stored
+                ):
+                    return None
+                self._used[url] = time.time()
+                return row[0]
+        except sqlite3.Error:
+            return None
+
+    def _write_used(self) -> None:
+        """Write use times of cache hits that are still pending."""
+        if self._used:
+            self._db.executemany(
+                "UPDATE responses SET used = ? WHERE url = ?",
+                [(used, url) for url, used in self._used.items()]
+            )
+            self._used.clear()
+
+    def _add_size(self, size: int) -> None:
+        """Add to total size and evict entries if it exceeds the cap."""
+        if self._total is None:
+            self._total = self._get_total()
+        else:
+            self._total += size
+        if self._total > self.max_size:
+            self._total = self._evict()
+
+    def _get_total(self) -> int:
+        """Return total size of the cached content."""
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def _evict(self) -> int:
+        """Delete least recently used entries above the size cap.
+
+        The total size is summed up again, as other processes may have
+        changed the cache. The remaining total size is returned.
+        """
+        total = self._get_total()
+        if total <= self.max_size:
+            return total
+        evicted = []
+        for url, size in self._db.execute(
+            "SELECT url, size FROM responses ORDER BY used"
+        ):
+            if total <= self.max_size:
+                break
+            evicted.append((url,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        return total
+
+
+class ZipStore:
+    """Content-addressed store of map zips keyed by level hash.
+
+    The zips are kept in subdirectories named after the first two
+    characters of their hash. Using a zip updates its modification time
+    and once the total size exceeds max_size the least recently used
+    zips are deleted. The store can be shared by several processes.
+
+    The total size is scanned with the first put and then kept up to
+    date, the store is only scanned again to evict zips.
+    """
+
+    def __init__(
+        self, directory: Path, max_size: int = 1024 * 1024 * 1024
+    ) -> None:
+        """Create store in directory with a size cap in bytes."""
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    def get(self, lvl_hash: str) -> Optional[IO[bytes]]:
+        """Return opened zip of level with hash if it is stored."""
+        path = self._get_path(lvl_hash)
+        try:
+            if path is None:
+                raise FileNotFoundError(lvl_hash)
+            # pylint: disable-next=consider-using-with
+            content = open(path, "rb")
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, lvl_hash: str, content: IO[bytes]) -> None:
+        """Store zip content of level with hash.
+
+        The content is copied from its start and rewound afterwards.
+        """
+        path = self._get_path(lvl_hash)
+        if path is None:
+            return
+        part_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            content.seek(0)
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, suffix=".part", delete=False
+            ) as part:
+                part_path = Path(part.name)
+                shutil.copyfileobj(content, part)
+                size = part.tell()
+            replaced = self._get_size(path)
+            os.replace(part_path, path)
+        except OSError:
+            if part_path is not None:
+                part_path.unlink(missing_ok=True)
+            return  # Failing to store a zip must not fail the download
+        finally:
+            content.seek(0)
+        self._add_size(size - replaced)
+
+    def remove(self, lvl_hash: str) -> None:
+        """Delete stored zip of level with hash."""
+        path = self._get_path(lvl_hash)
+        if path is None:
+            return
+        size = self._get_size(path)
+        try:
+            path.unlink()
+        except OSError:
+            return
+        self._add_size(-size)
+
+    def _add_size(self, size: int) -> None:
+        """Add to total size and evict zips if it exceeds the cap."""
+        with self._lock:
+            if self._total is None:
+                self._total = sum(stored for _, stored, _ in self._scan())
+            else:
+                self._total += size
+            if self._total > self.max_size:
+                self._total = self._evict()
+
+    @staticmethod
+    def _get_size(path: Path) -> int:
+        """Return size of file at path, or 0 if it doesn't exist."""
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _get_path(self, lvl_hash: str) -> Optional[Path]:
+        """Return path of zip for hash, or None if hash is invalid."""
+        lvl_hash = lvl_hash.lower()
+        if not is_level_hash(lvl_hash):
+            return None
+        return self.directory / lvl_hash[:2] / f"{lvl_hash}.zip"
+
+    def _evict(self) -> int:
+        """Delete least recently used zips above the size cap.
+
+        The store is scanned again, as other processes may have changed
+        it. The remaining total size is returned.
+        """
+        zips = self._scan()
+        total = sum(size for _, size, _ in zips)
+        for _, size, path in sorted(zips):
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue  # Zips in use can't be deleted on Windows
+            total -= size
+        return total
+
+    def _scan(self) -> List[Tuple[int, int, Path]]:
+        """Return mtime, size and path of every stored zip."""
+        zips = []
+        for path in self.directory.glob("*/*.zip"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            zips.append((stat.st_mtime_ns, stat.st_size, path))
+        return zips
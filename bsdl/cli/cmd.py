@@ -13,37 +13,81 @@
 
 """CLI command functions for beatsaber-playlist-manager."""
 
+import threading
+import time
+
 from logging import Logger
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ..core.exceptions import BeatSaberError, BeatSaverApiError, ModelError
-from ..core.models import BsInvalidLocal, BsPlaylist, PlaylistItem, CustomLevel
+from ..core.exceptions import BeatSaberError, BeatSaverApiError, \
+    BeatSaverNotFoundError, ModelError
+from ..core.models import BsInvalidLocal, BsMap, BsPlaylist, PlaylistItem, \
+    CustomLevel
+from ..core.pipeline import Pipeline, Stage
 from ..beatsaver import BeatSaverApi
+from ..cache import ResponseCache, ZipStore
 from ..local import BeatSaberManager
-from .utils import BplListPrinter, LvlListPrinter
+from .utils import BplListPrinter, LvlListPrinter, LvlVerifyPrinter
 
 
 class CliCommands(BeatSaberManager):
     """Container for functions corresponding to cli commands."""
 
-    def __init__(self, beatsaber_directory: Path, logger: Logger) -> None:
-        """Initialize command namespace with given local manager."""
-        super().__init__(beatsaber_directory)
-        self.api = BeatSaverApi()
+    def __init__(  # pylint: disable=too-many-arguments
+        self, beatsaber_directory: Path, logger: Logger, jobs: int = 1, *,
+        api: Optional[BeatSaverApi] = None, level_pool: Optional[Path] = None,
+        scan_threads: int = 0
+    ) -> None:
+        """Initialize command namespace with given local manager.
+
+        Several command namespaces can share an API handler.
+        """
+        super().__init__(
+            beatsaber_directory, level_pool=level_pool,
+            scan_threads=scan_threads
+        )
+        self.api = api or BeatSaverApi(pool_size=max(10, 2 * jobs))
         self.log = logger
+        self.jobs = jobs
+        self.parse_jobs = jobs
+        self.summary = dict.fromkeys((
+            "Playlists Installed", "Playlists Removed", "Levels Installed",
+            "Levels Removed", "Errors"
+        ), 0)
+        self._summary_lock = threading.Lock()
+
+    @staticmethod
+    def create_api(
+        logger: Logger, jobs: int = 1, cache_dir: Optional[Path] = None,
+        zip_cache_size: int = 0
+    ) -> BeatSaverApi:
+        """Return API handler for the given number of jobs.
+
+        BeatSaver responses are cached in the cache directory if given.
+        Level zips are cached there too if the size limit is above 0.
+        """
+        cache = None
+        if cache_dir is not None:
+            cache = ResponseCache.open(cache_dir / "responses.sqlite")
+            if cache is None:
+                logger.warning("Can't Open Response Cache in %s", cache_dir)
+        api = BeatSaverApi(pool_size=max(10, 2 * jobs), cache=cache)
+        if cache_dir is not None and zip_cache_size > 0:
+            api.zip_store = ZipStore(cache_dir / "zips", zip_cache_size)
+        return api
 
     def bpl_lvl_sync(self, remove: bool) -> None:
         """Print (optionally remove) custom levels not in a playlist."""
         self.log.info("Retrieving Levels That Are Not Part of Any Playlist")
-        lvl_list = self.get_custom_levels()
-        bpl_list, bpl_errs = self.get_playlists()
+        lvl_list = self.snapshot.levels
+        bpl_errs = self.snapshot.invalid_playlists
         if bpl_errs:
             err_msg = "Skipping Song Removal" if remove else None
             self.log_bpl_warn(bpl_errs, err_msg)
             remove = False
         for lvl in lvl_list:
-            if any(bpl.contains_song(lvl) for bpl in bpl_list):
+            if self.snapshot.is_in_playlist(lvl.key):
                 continue
             self.log.info("%s", lvl)
             if remove:
@@ -54,23 +98,32 @@ class CliCommands(BeatSaberManager):
                     self.log_exc("Can't Remove Level", lvl, exc)
 
     def bpl_install(self, bpl_list: List[str], kind: str, force: bool) -> None:
-        """Install given playlists under specified parameters."""
+        """Install given playlists under specified parameters.
+
+        The HTTP validators of downloaded playlists are stored, so the
+        next check for outdated playlists can be conditional.
+        """
         self.log.info("Installing %s Playlist(s) From %s", len(bpl_list), kind)
+        installed = []
         for bpl_ref in bpl_list:
             try:
-                if kind == "keys":
-                    bpl = self.api.get_playlist_by_key(bpl_ref)
-                elif kind == "files":
+                validators = None
+                if kind == "files":
                     filepath = Path(bpl_ref)
                     bpl = BsPlaylist.from_json(filepath.read_bytes())
                 else:
-                    bpl = self.api.get_playlist_from_url(bpl_ref)
+                    url = bpl_ref
+                    if kind == "keys":
+                        url = self.api.get_playlist_url(bpl_ref)
+                    bpl, validators = self.api.get_playlist_if_modified(url)
                 if not force and self.get_playlist_by_key(bpl.key) is not None:
                     self.log.warning("%s: Found Existing Playlist", bpl)
                     continue
                 self.log.info("%s: Installing Playlist", bpl)
                 self.install_playlist(bpl)
-                self._install_playlist_songs(bpl)
+                if validators is not None:
+                    self.set_playlist_validators(bpl, bpl, validators)
+                installed.append(bpl)
             except BeatSaberError as exc:
                 self.log_exc("Can't Install Playlist", bpl_ref, exc)
             except BeatSaverApiError as exc:
@@ -79,29 +132,31 @@ class CliCommands(BeatSaberManager):
                 self.log_exc("Can't Construct Playlist", bpl_ref, exc)
             except OSError as exc:
                 self.log_exc("Can't Read Playlist", bpl_ref, exc.args[0])
+        self._install_playlist_songs(installed)
 
     def bpl_list(self, outdated: bool) -> None:
         """Print information about all installed playlists."""
-        bpl_list, bpl_errs = self.get_playlists()
+        bpl_list, bpl_errs = self.snapshot.get_playlists()
         if bpl_errs:
             self.log_bpl_warn(bpl_errs)
         printer = BplListPrinter(outdated)
-        for bpl in bpl_list:
-            if outdated:
-                try:
-                    remote_bpl = self.api.get_playlist_by_key(bpl.key)
-                    is_outdated = remote_bpl.checksum != bpl.checksum
-                    printer.append(bpl, is_outdated)
-                    continue
-                except BeatSaverApiError as exc:
-                    self.log_exc("Can't Download Playlist", bpl, exc)
-            printer.append(bpl)
+        if not outdated:
+            for bpl in bpl_list:
+                printer.append(bpl)
+            printer.print()
+            return
+        for bpl, remote_bpl, latency in self._check_playlists(bpl_list):
+            if remote_bpl is None:
+                printer.append(bpl, latency=latency)
+            else:
+                is_outdated = remote_bpl.checksum != bpl.checksum
+                printer.append(bpl, is_outdated, latency)
         printer.print()
 
     def bpl_remove(self, bpl_list: List[str], kind: str, keep: bool) -> None:
         """Remove playlist and optionally all songs unique to it."""
         self.log.info("Removing %s Playlist(s) From %s", len(bpl_list), kind)
-        local_bpls, bpl_errs = self.get_playlists()
+        bpl_errs = self.snapshot.invalid_playlists
         if bpl_errs:
             err_msg = "Skipping Song Removal" if not keep else None
             self.log_bpl_warn(bpl_errs, err_msg)
@@ -120,6 +175,7 @@ class CliCommands(BeatSaberManager):
             else:
                 bpl = self.get_playlist_by_key(bpl_ref)
                 if bpl is None:
+                    self._count("Errors")
                     self.log.error("%s: Can't Find Playlist With Key", bpl_ref)
                     continue
             self.log.info("%s: Removing Playlist", bpl)
@@ -130,8 +186,7 @@ class CliCommands(BeatSaberManager):
                 continue
             if not keep:
                 self._remove_lvls_not_in_bpls(
-                    bpl_items=bpl.songs,
-                    bpl_list=[b for b in local_bpls if b.key != bpl.key]
+                    bpl_items=bpl.songs, exclude=bpl.key
                 )
 
     def bpl_upgrade(
@@ -149,16 +204,14 @@ class CliCommands(BeatSaberManager):
                 bpls.append(local_bpl)
         else:
             self.log.info("Upgrading All Playlists")
-            bpls, bpl_errs = self.get_playlists()
+            bpls, bpl_errs = self.snapshot.get_playlists()
             if bpl_errs:
                 self.log_bpl_warn(bpl_errs)
-        for bpl in bpls:
-            self.log.info("%s: Upgrading Playlist", bpl)
-            try:
-                remote_bpl = self.api.get_playlist_from_url(bpl.url)
-            except BeatSaverApiError as exc:
-                self.log_exc("Can't Check Playlist", bpl, exc)
+        outdated, installed = [], []
+        for bpl, remote_bpl, latency in self._check_playlists(bpls):
+            if remote_bpl is None:
                 continue
+            self.log.info("%s: Checked Playlist in %.2fs", bpl, latency)
             if remote_bpl.checksum == bpl.checksum:
                 self.log.warning("%s: Skipping Playlist: Not Outdated", bpl)
                 continue
@@ -168,29 +221,50 @@ class CliCommands(BeatSaberManager):
             except BeatSaberError as exc:
                 self.log_exc("Can't Install Playlist:", bpl, exc)
                 continue
-            self._install_playlist_songs(remote_bpl)
-            if remove:
-                self._remove_lvls_not_in_bpls(bpl_items=bpl.songs)
+            outdated.append(bpl)
+            installed.append(remote_bpl)
+        self._install_playlist_songs(installed)
+        if remove and outdated:
+            self._remove_lvls_not_in_bpls(
+                bpl_items=list(self._merge_playlist_songs(outdated).values())
+            )
 
     def lvl_install(self, lvl_list: List[str], kind: str, force: bool) -> None:
         """Install given levels under specified parameters."""
         self.log.info("Installing %s Levels From %s", len(lvl_list), kind)
+        lvl_refs: Dict[str, str] = {}
+        fetched: Dict[str, BsMap] = {}
         for lvl_ref in lvl_list:
             try:
                 if kind == "keys":
-                    lvl = self.api.get_song_by_key(lvl_ref)
-                else:
+                    lvl_refs.setdefault(lvl_ref, lvl_ref)
+                    continue
+                try:
+                    key = self.api.get_song_key_from_url(lvl_ref)
+                except BeatSaverApiError:
+                    # Level urls like /maps/hash/<hash> are looked up
                     lvl = self.api.get_song_from_url(lvl_ref)
+                    fetched.setdefault(lvl.key, lvl)
+                    key = lvl.key
+                lvl_refs.setdefault(key, lvl_ref)
             except BeatSaverApiError as exc:
                 self.log_exc("Can't Fetch Level Data", lvl_ref, exc)
-                continue
+        lvls, errors = self.api.get_songs_by_keys(
+            key for key in lvl_refs if key not in fetched
+        )
+        for key, exc in errors.items():
+            self.log_exc("Can't Fetch Level Data", lvl_refs[key], exc)
+        for lvl in [*fetched.values(), *lvls]:
+            lvl_ref = lvl_refs.get(lvl.key, lvl.key)
             self.log.info("%s: Installing Level", lvl)
             if not force and self.get_custom_level_by_key(lvl.key) is not None:
                 self.log.warning("%s: Level Is Already Installed", lvl)
                 continue
             try:
                 self.log.info("%s: Downloading Level", lvl)
-                lvl_map = self.api.download_map_from_url(lvl)
+                lvl_map = self.api.download_map_from_url(
+                    lvl, self.get_partial_download_path(lvl)
+                )
                 self.log.info("%s: Extracting Level Data", lvl)
                 self.install_custom_level(lvl_map)
             except BeatSaverApiError as exc:
@@ -200,17 +274,17 @@ class CliCommands(BeatSaberManager):
 
     def lvl_list(self, check_bpls: bool) -> None:
         """Print information about all installed custom levels."""
-        lvl_list = self.get_custom_levels()
-        bpl_list, bpl_errs = self.get_playlists()
+        lvl_list = self.snapshot.levels
+        bpl_errs = self.snapshot.invalid_playlists
         if check_bpls and bpl_errs:
             self.log_bpl_warn(bpl_errs)
         printer = LvlListPrinter(check_bpls)
         for lvl in lvl_list:
             if check_bpls:
-                printer.append(
-                    lvl,
-                    [bpl.title for bpl in bpl_list if bpl.contains_song(lvl)]
-                )
+                printer.append(lvl, [
+                    bpl.title
+                    for bpl in self.snapshot.get_song_playlists(lvl.key)
+                ])
             else:
                 printer.append(lvl)
         printer.print()
@@ -218,7 +292,7 @@ class CliCommands(BeatSaberManager):
     def lvl_remove(self, lvl_list: List[str], kind: str, force: bool) -> None:
         """Remove a custom level."""
         self.log.info("Removing %s Levels From %s", len(lvl_list), kind)
-        bpl_list, bpl_errs = self.get_playlists()
+        bpl_errs = self.snapshot.invalid_playlists
         if bpl_errs:
             self.log_bpl_warn(bpl_errs)
         for lvl_ref in lvl_list:
@@ -236,7 +310,7 @@ class CliCommands(BeatSaberManager):
                 self.log_exc("Can't Locate Level", lvl_ref, exc)
                 continue
             self.log.info("%s: Removing Level", lvl)
-            if not force and any(bpl.contains_song(lvl) for bpl in bpl_list):
+            if not force and self.snapshot.is_in_playlist(lvl.key):
                 self.log_lvl_skip(lvl)
                 continue
             try:
@@ -244,46 +318,232 @@ class CliCommands(BeatSaberManager):
             except BeatSaberError as exc:
                 self.log_exc("Can't Remove Level", lvl_ref, exc)
 
-    def _install_playlist_songs(self, bpl: BsPlaylist) -> None:
-        """Install all songs of given playlist."""
-        for lvl in bpl.songs:
+    def lvl_verify(self) -> None:
+        """Print levels that are missing, corrupted or don't match.
+
+        Installed levels are compared with the hashes of their songs in
+        all installed playlists, songs without hash are skipped.
+        """
+        lvls = self.snapshot.levels
+        bpl_errs = self.snapshot.invalid_playlists
+        if bpl_errs:
+            self.log_bpl_warn(bpl_errs)
+        self.log.info("Verifying %s Levels", len(lvls))
+        hashes, invalids = self.get_level_hashes(lvls, self.jobs)
+        songs: Dict[str, List[Tuple[BsPlaylist, PlaylistItem]]] = {}
+        for bpl in self.snapshot.playlists:
+            for song in bpl.songs:
+                songs.setdefault(song.key, []).append((bpl, song))
+        printer = LvlVerifyPrinter()
+        for key, bpl_songs in songs.items():
+            if self.get_custom_level_by_key(key) is None:
+                printer.append(
+                    key, bpl_songs[0][1].name, printer.missing,
+                    [bpl.title for bpl, _ in bpl_songs]
+                )
+        for invalid in invalids:
+            lvl = CustomLevel(invalid.path)
+            printer.append(lvl.key, lvl.name, printer.corrupted, [
+                bpl.title for bpl in self.snapshot.get_song_playlists(lvl.key)
+            ])
+        for lvl in lvls:
+            lvl_hash = hashes.get(lvl.directory.name)
+            mismatched = [
+                bpl.title for bpl, song in songs.get(lvl.key, ())
+                if lvl_hash is not None and song.hash
+                and song.hash.lower() != lvl_hash
+            ]
+            if mismatched:
+                printer.append(
+                    lvl.key, lvl.name, printer.mismatched, mismatched
+                )
+        printer.print()
+        self.log.debug("%r", invalids)
+        self.log.info(
+            "Verified %s Levels: %s", len(lvls), ", ".join(
+                f"{num} {problem.title()}"
+                for problem, num in printer.counts.items()
+            )
+        )
+
+    def _check_playlists(
+        self, bpls: List[BsPlaylist]
+    ) -> List[Tuple[BsPlaylist, Optional[BsPlaylist], float]]:
+        """Return playlists with their remote version and fetch latency.
+
+        The remote playlists are fetched concurrently by the job workers
+        and returned in the order of the given playlists. If a remote
+        playlist can't be fetched the error is logged and it is None.
+        Requests are conditional on stored HTTP validators and if the
+        remote playlist wasn't modified the local one is returned as it.
+        """
+        def fetch(item: Tuple[int, BsPlaylist]) -> Tuple[int, Any, float]:
+            idx, bpl = item
+            start = time.perf_counter()
+            try:
+                remote, validators = self.api.get_playlist_if_modified(
+                    bpl.url, self.get_playlist_validators(bpl)
+                )
+                if remote is None:
+                    remote = bpl
+                else:
+                    self.set_playlist_validators(bpl, remote, validators)
+            except BeatSaverApiError as exc:
+                remote = exc
+            return idx, remote, time.perf_counter() - start
+
+        self.log.info("Checking %s Playlists", len(bpls))
+        start = time.perf_counter()
+        results = sorted(
+            Pipeline(Stage("check", fetch, self.jobs)).run(enumerate(bpls)),
+            key=lambda result: result[0]
+        )
+        checks = []
+        for idx, remote, latency in results:
+            bpl = bpls[idx]
+            if isinstance(remote, BeatSaverApiError):
+                self.log_exc("Can't Check Playlist", bpl, remote)
+                remote = None
+            checks.append((bpl, remote, latency))
+        self.log.info(
+            "Checked %s Playlists in %.2fs",
+            len(bpls), time.perf_counter() - start
+        )
+        return checks
+
+    def _install_playlist_songs(self, bpls: List[BsPlaylist]) -> None:
+        """Install all songs of given playlists.
+
+        The songs of all playlists are merged into one work list before
+        anything is downloaded, so every level is installed at most once
+        even if several playlists or workers would schedule it. Songs
+        are downloaded from the BeatSaver CDN by their hash. Only songs
+        the CDN can't find are looked up through their metadata.
+        """
+        songs = self._merge_playlist_songs(bpls)
+        missing = []
+        for lvl in songs.values():
+            if self.get_custom_level_by_key(lvl.key) is not None:
+                self.log.info("%s: Level Is Already Installed", lvl)
+                continue
+            missing.append(lvl)
+        if not missing:
+            return
+        self.log.info(
+            "Installing %s Levels of %s Playlists", len(missing), len(bpls)
+        )
+        not_found: List[PlaylistItem] = []
+        Pipeline(
+            Stage("download", self._download_playlist_song_by_hash(
+                not_found
+            ), self.jobs),
+            Stage("extract", self._extract_playlist_song, self.jobs)
+        ).run(missing)
+        if not not_found:
+            return
+        chunk_size = self.api.max_ids_per_request
+        Pipeline(
+            Stage("metadata", self._fetch_playlist_songs, self.jobs, True),
+            Stage("download", self._download_playlist_song, self.jobs),
+            Stage("extract", self._extract_playlist_song, self.jobs)
+        ).run(
+            not_found[idx:idx + chunk_size]
+            for idx in range(0, len(not_found), chunk_size)
+        )
+
+    @staticmethod
+    def _merge_playlist_songs(
+        bpls: List[BsPlaylist]
+    ) -> Dict[str, PlaylistItem]:
+        """Return songs of all playlists without duplicates by key."""
+        songs: Dict[str, PlaylistItem] = {}
+        for bpl in bpls:
+            for song in bpl.songs:
+                songs.setdefault(song.key.lower(), song)
+        return songs
+
+    def _download_playlist_song_by_hash(
+        self, not_found: List[PlaylistItem]
+    ) -> Callable[[PlaylistItem], Optional[BsMap]]:
+        """Return function downloading playlist songs by their hash.
+
+        Songs the CDN can't find are appended to the given list.
+        """
+        def download(lvl: PlaylistItem) -> Optional[BsMap]:
             try:
-                if self.get_custom_level_by_key(lvl.key) is not None:
-                    self.log.info("%s: Level Is Already Installed", lvl)
-                    continue
                 self.log.info("%s: Starting Download", lvl)
-                lvl_data = self.api.get_song_by_key(lvl.key)
-                custom_lvl = self.api.download_map_from_url(lvl_data)
-                self.log.info("%s: Installing Level", lvl)
-                self.install_custom_level(custom_lvl)
-            except BeatSaberError as exc:
-                self.log_exc("Can't Install Level", lvl, exc)
+                return self.api.download_map_by_hash(
+                    lvl, self.get_partial_download_path(lvl)
+                )
+            except BeatSaverNotFoundError:
+                self.log.debug("%s: Can't Find Level by Hash", lvl)
+                not_found.append(lvl)
             except BeatSaverApiError as exc:
                 self.log_exc("Can't Download Level", lvl, exc)
+            return None
+        return download
+
+    def _fetch_playlist_songs(
+        self, songs: List[PlaylistItem]
+    ) -> List[BsMap]:
+        """Return level metadata for a chunk of playlist songs."""
+        for lvl in songs:
+            self.log.info("%s: Looking Up Level Data", lvl)
+        lvls, errors = self.api.get_songs_by_keys(lvl.key for lvl in songs)
+        for lvl in songs:
+            if lvl.key in errors:
+                self.log_exc("Can't Download Level", lvl, errors[lvl.key])
+        return lvls
+
+    def _download_playlist_song(self, lvl: BsMap) -> Optional[BsMap]:
+        """Return level with downloaded zip content."""
+        try:
+            return self.api.download_map_from_url(
+                lvl, self.get_partial_download_path(lvl)
+            )
+        except BeatSaverApiError as exc:
+            self.log_exc("Can't Download Level", lvl, exc)
+        return None
+
+    def _extract_playlist_song(self, lvl: BsMap) -> None:
+        """Extract downloaded level into custom level directory.
+
+        The zip content is closed even if extracting fails unexpectedly.
+        """
+        try:
+            self.log.info("%s: Installing Level", lvl)
+            self.install_custom_level(lvl)
+        except BeatSaberError as exc:
+            self.log_exc("Can't Install Level", lvl, exc)
+        finally:
+            if lvl.content is not None:
+                lvl.content.close()
 
     def _remove_lvls_not_in_bpls(
         self, force: bool = False,
         lvl_list: Optional[List[CustomLevel]] = None,
         bpl_items: Optional[List[PlaylistItem]] = None,
-        bpl_list: Optional[List[BsPlaylist]] = None
+        exclude: Optional[str] = None
     ) -> None:
-        """Remove given levels if they are not in a playlist."""
+        """Remove given levels if they are not in a playlist.
+
+        Installed playlists with the key given as exclude are ignored.
+        """
         if lvl_list is None and bpl_items is not None:
             lvl_list = self._bpl_items_to_lvls(bpl_items)
         elif lvl_list is None and bpl_items is None:
-            lvl_list = self.get_custom_levels()
+            lvl_list = self.snapshot.levels
         elif lvl_list is not None and bpl_items is not None:
             lvl_list += self._bpl_items_to_lvls(bpl_items)
-        if bpl_list is None:
-            bpl_list, bpl_errs = self.get_playlists()
-            if bpl_errs:
-                self.log_bpl_warn(bpl_errs)
-                if not force:
-                    self.log.error("Aborting Removal Because It Isn't Forced")
-                    return
+        bpl_errs = self.snapshot.invalid_playlists
+        if bpl_errs:
+            self.log_bpl_warn(bpl_errs)
+            if not force:
+                self.log.error("Aborting Removal Because It Isn't Forced")
+                return
         for lvl in lvl_list:
             self.log.info("%s: Removing level", lvl)
-            if any(bpl.contains_song(lvl) for bpl in bpl_list) and not force:
+            if self.snapshot.is_in_playlist(lvl.key, exclude) and not force:
                 self.log_lvl_skip(lvl)
                 continue
             try:
@@ -303,6 +563,59 @@ class CliCommands(BeatSaberManager):
             lvl_list.append(lvl)
         return lvl_list
 
+    def install_playlist(self, bpl: BsPlaylist) -> None:
+        """Write playlist to file and count it in the summary."""
+        super().install_playlist(bpl)
+        self._count("Playlists Installed")
+
+    def remove_playlist(self, bpl: BsPlaylist) -> None:
+        """Remove playlist file and count it in the summary."""
+        super().remove_playlist(bpl)
+        self._count("Playlists Removed")
+
+    def install_custom_level(self, lvl: BsMap) -> None:
+        """Extract level and count it in the summary."""
+        super().install_custom_level(lvl)
+        self._count("Levels Installed")
+
+    def remove_custom_level(self, lvl: CustomLevel) -> None:
+        """Remove level and count it in the summary."""
+        super().remove_custom_level(lvl)
+        self._count("Levels Removed")
+
+    def _count(self, name: str) -> None:
+        """Increase counter of the summary with given name."""
+        with self._summary_lock:
+            self.summary[name] += 1
+
+    def log_summary(self) -> None:
+        """Log counters of the summary for the installation."""
+        self.log.info("%s: Summary: %s", self.directory, ", ".join(
+            f"{num} {name}" for name, num in self.summary.items()
+        ))
+
+    def log_cache_stats(self) -> None:
+        """Log hit and miss counters of the response and zip cache."""
+        cache, zips = self.api.cache, self.api.zip_store
+        if cache is not None and cache.hits + cache.misses:
+            self.log.info(
+                "Response Cache: %s Hits, %s Misses, %s Served While Offline",
+                cache.hits, cache.misses, cache.stale_hits
+            )
+        if zips is not None and zips.hits + zips.misses:
+            self.log.info(
+                "Zip Cache: %s Hits, %s Misses", zips.hits, zips.misses
+            )
+
+    def log_rate_limits(self) -> None:
+        """Log hosts that throttled requests and their current rate."""
+        for host, limiter in self.api.limiters.items():
+            if limiter.throttled:
+                self.log.info(
+                    "%s: Throttled %s Times, Now %.1f Requests/s",
+                    host, limiter.throttled, limiter.rate
+                )
+
     def log_lvl_skip(self, lvl: CustomLevel) -> None:
         """Log warning that a level in a playlist won't be removed."""
         self.log.warning("%s: Aborting Removal: Found Level in Playlists", lvl)
@@ -317,5 +630,6 @@ class CliCommands(BeatSaberManager):
 
     def log_exc(self, msg: str, ident: Any, exc: Any) -> None:
         """Log a message at error and exception info at debug level."""
+        self._count("Errors")
         self.log.error("%s: %s: %s", ident, msg, exc)
         self.log.debug("Exception(s) That Caused the Above Error:", exc_info=1)
@@ -13,31 +13,80 @@
 
 """Main entry point for beatsaber-playlist-manager."""
 
+import tempfile
+
+from argparse import Namespace
+from contextlib import ExitStack
+from pathlib import Path
+
 from .cmd import CliCommands
-from .utils import CommandLineInterface
+from .utils import CommandLineInterface, get_beatsaber_dirs
+from ..cache import ZipStore
 from ..core.exceptions import BeatSaberError
 from ..core.utils import get_logger
 
 
 def main() -> None:
-    """Parse command line arguments and delegate to command function."""
+    """Parse command line arguments and delegate to command function.
+
+    With several Beat Saber directories the command runs for each of
+    them in turn. The installations share one API handler that fetches
+    every playlist and level only once.
+    """
     cli = CommandLineInterface.setup()
     args = cli.parse_args()
+    beatsaber_dirs = get_beatsaber_dirs(cli, args.beatsaber)
     command, action = args.command, args.subcommand
+    if command == "bpl" and action == "install" and args.keys and args.files:
+        cli.error("can't set --keys and --files together")
     logger = get_logger(f"{command}-{action}", args.log_level)
-    logger.debug("BEATSABER_DIRECTORY: %s", args.beatsaber)
-    try:
-        cmd = CliCommands(args.beatsaber, logger)
-    except BeatSaberError as exc:
-        logger.error("Can't Create Beat Saber Subdirectory: %s", exc)
-        logger.debug("%r", exc, exc_info=1)
+    logger.debug("BEATSABER_DIRECTORIES: %s", beatsaber_dirs)
+    logger.debug("JOBS: %s", args.jobs)
+    logger.debug("CACHE_DIRECTORY: %s", args.cache_dir)
+    logger.debug("ZIP_CACHE_SIZE: %s MiB", args.zip_cache_size)
+    logger.debug("LEVEL_POOL: %s", args.level_pool)
+    logger.debug("SCAN_THREADS: %s", args.scan_threads)
+    api = CliCommands.create_api(
+        logger, args.jobs, args.cache_dir, args.zip_cache_size * 1024 * 1024
+    )
+    cmds = []
+    for beatsaber_dir in beatsaber_dirs:
+        try:
+            cmds.append(CliCommands(
+                beatsaber_dir, logger, args.jobs, api=api,
+                level_pool=args.level_pool, scan_threads=args.scan_threads
+            ))
+        except BeatSaberError as exc:
+            logger.error("Can't Create Beat Saber Subdirectory: %s", exc)
+            logger.debug("%r", exc, exc_info=1)
+    if not cmds:
         return
+    with ExitStack() as stack:
+        if api.cache is not None:
+            stack.callback(api.cache.close)
+        if len(cmds) > 1:
+            api.memo = {}
+            if api.zip_store is None:
+                tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+                api.zip_store = ZipStore(Path(tmp_dir), 2 ** 63)
+        for cmd in cmds:
+            if len(cmds) > 1:
+                logger.info("%s: Running Command", cmd.directory)
+            run_command(cmd, args)
+        if len(cmds) > 1:
+            for cmd in cmds:
+                cmd.log_summary()
+        cmds[-1].log_cache_stats()
+        cmds[-1].log_rate_limits()
+
+
+def run_command(cmd: CliCommands, args: Namespace) -> None:
+    """Run the command selected by arguments for one installation."""
+    command, action = args.command, args.subcommand
     if action == "sync":
         cmd.bpl_lvl_sync(args.remove)
     elif command == "bpl":
         if action == "install":
-            if args.keys and args.files:
-                cli.error("can't set --keys and --files together")
             kind = "keys" if args.keys else "files" if args.files else "urls"
             cmd.bpl_install(args.playlist, kind, args.force)
         elif action == "list":
@@ -56,6 +105,8 @@ def main() -> None:
         elif action == "rm":
             kind = "files" if args.files else "keys"
             cmd.lvl_remove(args.level, kind, args.force)
+        elif action == "verify":
+            cmd.lvl_verify()
 
 
 if __name__ == '__main__':
@@ -18,10 +18,10 @@ import os
 from argparse import ArgumentParser, RawDescriptionHelpFormatter, \
     ArgumentTypeError as ArgError, _SubParsersAction as SubParser
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, List, Optional
 
 from ..core.models import BsPlaylist, CustomLevel
-from ..core.utils import LOG_LEVELS
+from ..core.utils import LOG_LEVELS, get_cache_dir
 
 
 def valid_log_level(level: str) -> str:
@@ -43,6 +43,65 @@ def valid_beatsaber_dir(path: str) -> Path:
     return arg_path
 
 
+def valid_beatsaber_dirs(paths: str) -> List[Path]:
+    """Return absolute paths of directories separated by os.pathsep.
+
+    Empty paths are skipped, as they would point to the working
+    directory.
+    """
+    dirs = [
+        valid_beatsaber_dir(path) for path in paths.split(os.pathsep) if path
+    ]
+    if not dirs:
+        raise ArgError("no Beat Saber directory given")
+    return dirs
+
+
+def get_beatsaber_dirs(
+    parser: ArgumentParser, dirs: Optional[List[Path]]
+) -> List[Path]:
+    """Return unique installation directories, default $BEATSABER."""
+    if dirs is None:
+        try:
+            dirs = valid_beatsaber_dirs(os.getenv("BEATSABER", "NOT_SET"))
+        except ArgError as exc:
+            parser.error(f"argument --beatsaber: {exc}")
+    return list(dict.fromkeys(dirs))
+
+
+def valid_jobs(jobs: str) -> int:
+    """Return number of jobs if it is a positive integer."""
+    try:
+        num = int(jobs)
+    except ValueError as exc:
+        raise ArgError(f"invalid number of jobs: '{jobs}'") from exc
+    if num < 1:
+        raise ArgError(f"number of jobs must be at least 1: '{jobs}'")
+    return num
+
+
+def valid_size(size: str) -> int:
+    """Return size in MiB if it is a non-negative integer."""
+    try:
+        num = int(size)
+    except ValueError as exc:
+        raise ArgError(f"invalid size: '{size}'") from exc
+    if num < 0:
+        raise ArgError(f"size must not be negative: '{size}'")
+    return num
+
+
+def valid_threads(threads: str) -> int:
+    """Return number of threads if it is a non-negative integer."""
+    try:
+        num = int(threads)
+    except ValueError as exc:
+        raise ArgError(f"invalid number of threads: '{threads}'") from exc
+    if num < 0:
+        raise ArgError(f"number of threads must not be negative: '{threads}'")
+    return num
+
+
 class CommandLineInterface:
     """Namespace for building the command line argument parser."""
 
@@ -53,8 +112,22 @@ class CommandLineInterface:
         self.epilog = "\n".join((
             "--log-level argument defaults to 'info' and can also be set with",
             "the environment variable $BSDL_LOG_LEVEL", "",
+            "--jobs argument defaults to 1 and can also be set with the",
+            "environment variable $BSDL_JOBS", "",
+            "--cache-dir argument defaults to the user cache directory and",
+            "can also be set with the environment variable $BSDL_CACHE_DIR",
+            "",
+            "--zip-cache-size argument defaults to 1024 and can also be set",
+            "with the environment variable $BSDL_ZIP_CACHE_SIZE", "",
+            "--level-pool argument is unset by default and can also be set",
+            "with the environment variable $BSDL_LEVEL_POOL", "",
+            "--scan-threads argument defaults to 0 and can also be set with",
+            "the environment variable $BSDL_SCAN_THREADS", "",
             "--beatsaber argument defaults to environment variable $BEATSABER",
-            "If the variable is not set, the argument MUST be provided"
+            "If the variable is not set, the argument MUST be provided",
+            "The argument can be given several times and the variable can",
+            f"hold several directories separated by '{os.pathsep}' to run the",
+            "command for several installations"
         ))
         self.parser = ArgumentParser(
             prog="bsdl",
@@ -65,8 +138,8 @@ class CommandLineInterface:
         self.parser.add_argument(
             "--beatsaber",
             help="path to directory where Beat Saber is installed",
-            default=os.getenv("BEATSABER", "NOT_SET"),
-            type=valid_beatsaber_dir,
+            action="extend",
+            type=valid_beatsaber_dirs,
             metavar="<dir>"
         )
         self.parser.add_argument(
@@ -77,6 +150,43 @@ class CommandLineInterface:
             type=valid_log_level,
             metavar="<level>"
         )
+        self.parser.add_argument(
+            "--jobs",
+            help="set the number of workers per download stage",
+            default=os.getenv("BSDL_JOBS", "1"),
+            type=valid_jobs,
+            metavar="<num>"
+        )
+        self.parser.add_argument(
+            "--cache-dir",
+            help="path to directory where BeatSaver responses are cached",
+            default=os.getenv("BSDL_CACHE_DIR", str(get_cache_dir())),
+            type=Path,
+            metavar="<dir>"
+        )
+        self.parser.add_argument(
+            "--zip-cache-size",
+            help="set the size limit of cached level zips in MiB (0 = off)",
+            default=os.getenv("BSDL_ZIP_CACHE_SIZE", "1024"),
+            type=valid_size,
+            metavar="<MiB>"
+        )
+        self.parser.add_argument(
+            "--level-pool",
+            help="path to directory where levels are shared between "
+                 "installations through links",
+            default=os.getenv("BSDL_LEVEL_POOL"),
+            type=Path,
+            metavar="<dir>"
+        )
+        self.parser.add_argument(
+            "--scan-threads",
+            help="set the number of threads scanning the library, e.g. on "
+                 "network drives (0 = scan without threads)",
+            default=os.getenv("BSDL_SCAN_THREADS", "0"),
+            type=valid_threads,
+            metavar="<num>"
+        )
         main = self.parser.add_subparsers(
             dest="command", required=True, metavar="<command>"
         )
@@ -209,6 +319,12 @@ class CommandLineInterface:
             "one (or more) BeatSaver key for custom level to be removed"
         )
 
+    def _lvl_verify(self) -> None:
+        """Set up 'lvl verify' command."""
+        self.add_lvl_cmd(
+            "verify", "check installed levels against playlist song hashes"
+        )
+
     def _bpl_lvl_sync(self) -> None:
         """Set up 'bpl sync' and 'lvl sync' commands."""
         for subparser, other in ((self.bpl, "lvl"), (self.lvl, "bpl")):
@@ -237,6 +353,7 @@ class CommandLineInterface:
         cli._lvl_install()
         cli._lvl_list()
         cli._lvl_remove()
+        cli._lvl_verify()
         cli._bpl_lvl_sync()
         return cli.parser
 
@@ -301,6 +418,47 @@ class LvlListPrinter(TablePrinter):
         self.add_row(self.table_row.format(key, title))
 
 
+class LvlVerifyPrinter(TablePrinter):
+    """Container for collecting and printing levels failing checks."""
+
+    missing = "missing"
+    corrupted = "corrupted"
+    mismatched = "mismatched"
+
+    def __init__(self) -> None:
+        """Create the printer with problem and playlist column."""
+        self.col_problem = "PROBLEM"
+        self.col_playlists = "PLAYLISTS"
+        self.counts = dict.fromkeys(
+            (self.missing, self.corrupted, self.mismatched), 0
+        )
+        super().__init__()
+        self._init_printing_table()
+
+    def append(
+        self, key: str, title: str, problem: str, bpls: Iterable[str] = ()
+    ) -> None:
+        """Append a row for a level with a problem and count it."""
+        self.counts[problem] += 1
+        self._add_problem_row(key, title, problem, ", ".join(bpls))
+
+    def _init_printing_table(self) -> None:
+        """Format table row and add head of printing table."""
+        self.table_row = "| {:6} | {:67} | {:^10} | {:24} |"
+        self._add_problem_row(
+            self.col_key, self.col_title, self.col_problem,
+            self.col_playlists
+        )
+        self._add_problem_row("-" * 6, "-" * 67, "-" * 10, "-" * 24)
+        self.default_len = len(self.printing_table)
+
+    def _add_problem_row(
+        self, key: str, title: str, problem: str, playlists: str
+    ) -> None:
+        """Append a row with problem column to printing table."""
+        self.add_row(self.table_row.format(key, title, problem, playlists))
+
+
 class BplListPrinter(TablePrinter):
     """Container for collecting and printing installed playlists."""
 
@@ -308,31 +466,45 @@ class BplListPrinter(TablePrinter):
         """Create printer with or without outdated column."""
         self.outdated = outdated
         self.col_old = "OUTDATED"
+        self.col_latency = "LATENCY"
         super().__init__()
         self._init_printing_table()
 
-    def append(self, bpl: BsPlaylist, outdated: bool = False) -> None:
-        """Append row for a playlist to printing table."""
+    def append(
+        self, bpl: BsPlaylist, outdated: bool = False,
+        latency: Optional[float] = None
+    ) -> None:
+        """Append row for a playlist to printing table.
+
+        The latency of the outdated check is given in seconds.
+        """
         if self.outdated:
-            self._add_outdated_row(bpl.key, bpl.title, "x" if outdated else "")
+            self._add_outdated_row(
+                bpl.key, bpl.title, "x" if outdated else "",
+                "" if latency is None else f"{latency:.2f}s"
+            )
         else:
             self._add_standard_row(bpl.key, bpl.title)
 
     def _init_printing_table(self) -> None:
         """Format table row and add head of printing table."""
         if self.outdated:
-            self.table_row = "| {:4} | {:98} | {:^8} |"
-            self._add_outdated_row(self.col_key, self.col_title, self.col_old)
-            self._add_outdated_row("-" * 4, "-" * 98, "-" * 8)
+            self.table_row = "| {:4} | {:87} | {:^8} | {:>8} |"
+            self._add_outdated_row(
+                self.col_key, self.col_title, self.col_old, self.col_latency
+            )
+            self._add_outdated_row("-" * 4, "-" * 87, "-" * 8, "-" * 8)
         else:
             self.table_row = "| {:4} | {:109} |"
             self._add_standard_row(self.col_key, self.col_title)
             self._add_standard_row("-" * 4, "-" * 109)
         self.default_len = len(self.printing_table)
 
-    def _add_outdated_row(self, key: str, name: str, outdated: str) -> None:
+    def _add_outdated_row(
+        self, key: str, name: str, outdated: str, latency: str
+    ) -> None:
         """Append a row with outdated column to printing table."""
-        self.add_row(self.table_row.format(key, name, outdated))
+        self.add_row(self.table_row.format(key, name, outdated, latency))
 
     def _add_standard_row(self, key: str, name: str) -> None:
         """Append a row without outdated column to printing table."""
@@ -0,0 +1,74 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""SQLite database base class for beatsaber-playlist-manager."""
+
+import sqlite3
+import threading
+
+from pathlib import Path
+from typing import Optional
+
+
+class Database:
+    """Base class for a versioned SQLite database file.
+
+    Subclasses set the schema script and its version. A database with a
+    different version has all of its tables dropped before the schema
+    is created again.
+    """
+
+    schema = ""
+    schema_version = 0
+
+    def __init__(self, path: Path) -> None:
+        """Open database at path and create missing tables."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.schema_version:
+                self._drop_tables()
+                self._db.execute(
+                    f"PRAGMA user_version = {int(self.schema_version)}"
+                )
+            self._db.executescript(self.schema)
+
+    @classmethod
+    def open(cls, path: Path, *args, **kwargs) -> Optional["Database"]:
+        """Return database at path, or None if it can't be used.
+
+        A database file that is corrupted is replaced by a new one.
+        """
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                return cls(path, *args, **kwargs)
+            except sqlite3.DatabaseError:
+                path.unlink(missing_ok=True)
+                return cls(path, *args, **kwargs)
+        except (OSError, sqlite3.Error):
+            return None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def _drop_tables(self) -> None:
+        """Drop all tables of an outdated schema."""
+        tables = self._db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ).fetchall()
+        for (table,) in tables:
+            self._db.execute(f'DROP TABLE "{table}"')
@@ -18,6 +18,14 @@ class BeatSaverApiError(Exception):
     """Error during request to BeatSaver API."""
 
 
+class BeatSaverNotFoundError(BeatSaverApiError):
+    """Requested item does not exist on BeatSaver."""
+
+
+class BeatSaverConnectionError(BeatSaverApiError):
+    """BeatSaver can't be reached or didn't answer in time."""
+
+
 class BeatSaberError(Exception):
     """Error during local custom level and playlist file interaction."""
 
@@ -15,25 +15,28 @@
 
 import dataclasses
 import json
+import sys
 
+from collections.abc import Sequence
 from pathlib import Path
-from typing import Optional, Tuple
-from zipfile import ZipFile
+from typing import IO, Any, Dict, Iterable, Iterator, Mapping, Optional, \
+    Tuple, Union
 
 from .exceptions import ModelError
-from .utils import get_checksum, get_windows_filename
+from .utils import get_checksum, get_windows_filename, strip_json_string
 
 
-@dataclasses.dataclass(repr=True)
+@dataclasses.dataclass(repr=True, slots=True)
 class Model:
     """Base Class for a data model."""
 
 
-@dataclasses.dataclass(repr=True)
+@dataclasses.dataclass(repr=True, slots=True)
 class CustomLevel(Model):
     """Container for locally installed custom level data."""
 
     directory: Path
+    key: str = dataclasses.field(init=False)
     name: str = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
@@ -46,7 +49,7 @@ class CustomLevel(Model):
         return self.name
 
 
-@dataclasses.dataclass(repr=True)
+@dataclasses.dataclass(repr=True, slots=True)
 class PlaylistItem(Model):
     """Container for a song in a BeatSaver playlist."""
 
@@ -59,7 +62,68 @@ class PlaylistItem(Model):
         return self.name
 
 
-@dataclasses.dataclass(repr=True)
+class PlaylistSongs(Sequence):
+    """Songs of a playlist stored in columns of keys, hashes and names.
+
+    The strings are interned, so a song in many playlists shares them.
+    Playlist items are created on access only.
+    """
+
+    __slots__ = ("keys", "hashes", "names")
+
+    def __init__(
+        self, keys: Iterable[str] = (), hashes: Iterable[str] = (),
+        names: Iterable[str] = ()
+    ) -> None:
+        """Create columns, all of them must have the same length."""
+        self.keys: Tuple[str, ...] = tuple(map(sys.intern, keys))
+        self.hashes: Tuple[str, ...] = tuple(map(sys.intern, hashes))
+        self.names: Tuple[str, ...] = tuple(map(sys.intern, names))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, str]]):
+        """Construct object from rows of key, hash and name."""
+        return cls(*zip(*rows))
+
+    def iter_rows(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield key, hash and name of every song."""
+        return zip(self.keys, self.hashes, self.names)
+
+    def __getitem__(self, index: Union[int, slice]):
+        """Return song at index or songs in a slice."""
+        if isinstance(index, slice):
+            return PlaylistSongs(
+                self.keys[index], self.hashes[index], self.names[index]
+            )
+        return PlaylistItem(
+            self.keys[index], self.hashes[index], self.names[index]
+        )
+
+    def __iter__(self) -> Iterator[PlaylistItem]:
+        """Yield all songs in order."""
+        for row in self.iter_rows():
+            yield PlaylistItem(*row)
+
+    def __len__(self) -> int:
+        """Return number of songs."""
+        return len(self.keys)
+
+    def __eq__(self, other: Any) -> bool:
+        """Return true if other holds the same songs."""
+        if not isinstance(other, PlaylistSongs):
+            return NotImplemented
+        return (self.keys, self.hashes, self.names) == (
+            other.keys, other.hashes, other.names
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return representation listing the songs."""
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+@dataclasses.dataclass(repr=True, slots=True)
 class BsPlaylist(Model):  # pylint: disable=too-many-instance-attributes
     """Container for playlist data from BeatSaver."""
 
@@ -68,39 +132,65 @@ class BsPlaylist(Model):  # pylint: disable=too-many-instance-attributes
     author: str
     description: str
     url: str
-    songs: Tuple[PlaylistItem]
-    json_raw: bytes
+    songs: PlaylistSongs
+    json_raw: Optional[bytes]
     filepath: Optional[Path] = None
     key: str = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
-        """Set key attribute parsed from playlist url."""
+        """Set key from playlist url and store songs as columns."""
         self.key = self.url.rsplit("/", 2)[-2]
+        if not isinstance(self.songs, PlaylistSongs):
+            self.songs = PlaylistSongs.from_rows(
+                (song.key, song.hash, song.name) for song in self.songs
+            )
 
     @classmethod
     def from_json(cls, raw: bytes, filepath: Optional[Path] = None):
-        """Return instance of class built from json content."""
+        """Return instance of class built from json content.
+
+        The json content is only kept if there is no file to read it
+        from again.
+        """
         try:
-            bplist = json.loads(raw)
+            bplist = cls._load_without_image(raw)
             checksum = get_checksum(raw)
             title = bplist["playlistTitle"]
             author = bplist["playlistAuthor"]
             desc = bplist["playlistDescription"]
             url = bplist["customData"]["syncURL"]
-            lvls = tuple(
-                PlaylistItem(s["key"], s["hash"], s["songName"])
+            lvls = PlaylistSongs.from_rows(
+                (s["key"], s.get("hash") or "", s["songName"])
                 for s in bplist["songs"]
             )
+            if filepath is not None:
+                raw = None
             return cls(checksum, title, author, desc, url, lvls, raw, filepath)
         except json.JSONDecodeError as exc:
             raise ModelError("can't parse json data") from exc
-        except KeyError as exc:
+        except (KeyError, TypeError) as exc:
             raise ModelError("can't read playlist data from json") from exc
 
+    def get_image(self) -> Optional[str]:
+        """Return cover image, decoding the json content on request."""
+        try:
+            image = json.loads(self.get_json_raw()).get("image")
+        except (json.JSONDecodeError, AttributeError) as exc:
+            raise ModelError("can't read playlist image from json") from exc
+        return image if isinstance(image, str) else None
+
+    def get_json_raw(self) -> bytes:
+        """Return json content, reading it from file if not loaded."""
+        if self.json_raw is not None:
+            return self.json_raw
+        if self.filepath is None:
+            raise ModelError("playlist has no json content")
+        return self.filepath.read_bytes()  # pylint: disable=no-member
+
     @property
     def song_keys(self) -> Tuple[str]:
         """Return tuple with keys of all songs."""
-        return tuple(s.key for s in self.songs)
+        return self.songs.keys
 
     @property
     def filename(self) -> str:
@@ -117,8 +207,46 @@ class BsPlaylist(Model):  # pylint: disable=too-many-instance-attributes
         """Return true if playlist contains given song."""
         return song.key in self.song_keys
 
+    @staticmethod
+    def _load_without_image(raw: bytes) -> Any:
+        """Return decoded json content skipping the cover image.
 
-@dataclasses.dataclass(repr=True)
+        The content is decoded completely if it can't be decoded
+        without the image.
+        """
+        try:
+            return json.loads(strip_json_string(raw, "image"))
+        except json.JSONDecodeError:
+            return json.loads(raw)
+
+
+@dataclasses.dataclass(repr=True, slots=True)
+class HttpValidators(Model):
+    """Container for HTTP validators of a downloaded resource."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str]):
+        """Construct object from HTTP response headers."""
+        return cls(headers.get("ETag"), headers.get("Last-Modified"))
+
+    def get_request_headers(self) -> Dict[str, str]:
+        """Return headers that make a GET request conditional."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def __bool__(self) -> bool:
+        """Return true if the resource has any validator."""
+        return self.etag is not None or self.last_modified is not None
+
+
+@dataclasses.dataclass(repr=True, slots=True)
 class BsInvalidLocal(Model):
     """Container for unreadable local Beat Saber playlist or level."""
 
@@ -126,7 +254,7 @@ class BsInvalidLocal(Model):
     exc: Exception
 
 
-@dataclasses.dataclass(repr=True)
+@dataclasses.dataclass(repr=True, slots=True)
 class BsMap(Model):
     """Container for custom map data from BeatSaver."""
 
@@ -134,25 +262,37 @@ class BsMap(Model):
     name: str
     author: str
     url: str
-    content: Optional[ZipFile] = None
+    hash: Optional[str] = None
+    content: Optional[IO[bytes]] = None
 
     @classmethod
     def from_json(cls, content: bytes):
         """Construct object from JSON."""
         try:
-            lvl = json.loads(content)
+            return cls.from_dict(json.loads(content))
+        except json.JSONDecodeError as exc:
+            raise ModelError("can't parse json data") from exc
+
+    @classmethod
+    def from_dict(cls, lvl: Dict[str, Any]):
+        """Construct object from decoded JSON map details."""
+        try:
             key = lvl["id"]
             title = lvl["name"]
             author = lvl["uploader"]["name"]
             url = lvl["versions"][-1]["downloadURL"]
-            return cls(key, title, author, url)
-        except json.JSONDecodeError as exc:
-            raise ModelError("can't parse json data") from exc
-        except KeyError as exc:
+            lvl_hash = lvl["versions"][-1].get("hash")
+            return cls(key, title, author, url, lvl_hash)
+        except (KeyError, IndexError, TypeError) as exc:
             raise ModelError("can't read custom level data from json") from exc
 
-    def add_content(self, content: ZipFile):
-        """Return new object with added beatmap data as zipfile."""
+    @classmethod
+    def from_playlist_item(cls, item: PlaylistItem, url: str):
+        """Construct object for playlist song with given zip url."""
+        return cls(item.key, item.name, "", url, item.hash)
+
+    def add_content(self, content: IO[bytes]):
+        """Return new object with added file containing zipped data."""
         return dataclasses.replace(self, content=content)
 
     @property
@@ -0,0 +1,108 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Concurrent staged pipeline for beatsaber-playlist-manager."""
+
+import dataclasses
+import queue
+import threading
+
+from typing import Any, Callable, Iterable, List, Optional
+
+_DONE = object()  # Sentinel telling a worker that its stage is finished
+
+
+@dataclasses.dataclass(repr=True)
+class Stage:
+    """Container for a pipeline step and its number of workers.
+
+    The function receives an item from the previous stage and returns
+    the item for the next stage. Returning None drops the item. If many
+    is set the function returns an iterable and each of its items is
+    passed on separately.
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    many: bool = False
+
+
+class Pipeline:  # pylint: disable=too-few-public-methods
+    """Run items through stages that are linked by bounded queues."""
+
+    def __init__(self, *stages: Stage, queue_size: int = 0) -> None:
+        """Create pipeline, queue size defaults to twice the workers."""
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.stages = stages
+        self.queues = [
+            queue.Queue(queue_size or 2 * max(1, stage.workers))
+            for stage in stages
+        ]
+        self.results: List[Any] = []
+        self.errors: List[BaseException] = []
+        self._lock = threading.Lock()
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Feed items to the first stage and return final results.
+
+        Putting an item blocks while the queue of a stage is full, which
+        keeps the number of items in flight bounded by the queue sizes.
+        An unexpected exception in any stage is raised after all other
+        items went through the pipeline.
+        """
+        workers = [
+            [
+                threading.Thread(
+                    target=self._work, args=(idx,),
+                    name=f"{stage.name}-{num}", daemon=True
+                )
+                for num in range(max(1, stage.workers))
+            ]
+            for idx, stage in enumerate(self.stages)
+        ]
+        for thread in (t for stage_threads in workers for t in stage_threads):
+            thread.start()
+        for item in items:
+            self.queues[0].put(item)
+        for idx, stage_threads in enumerate(workers):
+            for _ in stage_threads:
+                self.queues[idx].put(_DONE)
+            for thread in stage_threads:
+                thread.join()
+        if self.errors:
+            raise self.errors[0]
+        return self.results
+
+    def _work(self, idx: int) -> None:
+        """Process items from the queue of a stage until it's done."""
+        stage = self.stages[idx]
+        out_queue: Optional[queue.Queue] = None
+        if idx + 1 < len(self.stages):
+            out_queue = self.queues[idx + 1]
+        while (item := self.queues[idx].get()) is not _DONE:
+            try:
+                result = stage.func(item)
+            except Exception as exc:  # pylint: disable=broad-except
+                with self._lock:
+                    self.errors.append(exc)
+                continue
+            if result is None:
+                continue
+            for out_item in result if stage.many else (result,):
+                if out_queue is not None:
+                    out_queue.put(out_item)
+                else:
+                    with self._lock:
+                        self.results.append(out_item)
@@ -0,0 +1,142 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Adaptive request rate limiting for beatsaber-playlist-manager."""
+
+import threading
+import time
+
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return seconds to wait from a Retry-After header value.
+
+    The header holds either a number of seconds or an HTTP date. None
+    is returned if it is missing or can't be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:  # pylint: disable=too-many-instance-attributes
+    """Thread-safe token bucket with an adaptive rate.
+
+    Requests aren't limited until the server is overloaded for the
+    first time, the rate then starts at decrease times the rate of the
+    recent requests. Every request takes a token, tokens refill at rate
+    per second up to burst. The rate grows by increase per second of
+    successful requests up to max_rate if set and is multiplied with
+    decrease when the server is overloaded, at most once per cooldown
+    seconds. A pause stops all requests, e.g. for the time the server
+    asked for in a Retry-After header.
+    """
+
+    def __init__(
+        self, rate: Optional[float] = None, burst: float = 10.0
+    ) -> None:
+        """Create limiter starting with a full bucket.
+
+        Without a rate requests are unlimited until the first throttle.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = 0.5
+        self.max_rate: Optional[float] = None
+        self.increase = 1.0
+        self.decrease = 0.5
+        self.cooldown = 1.0
+        self.max_pause = 60.0  # Longest Retry-After that is honoured
+        self.throttled = 0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._decreased = float("-inf")
+        self._recent: Deque[float] = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return seconds to wait before using it.
+
+        Tokens are lent ahead of time, so callers waiting at the same
+        time are spread out at the current rate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                self._recent.append(now)
+                return max(0.0, self._updated - now)
+            self._refill(now)
+            self._tokens -= 1
+            return self._updated - now + max(0.0, -self._tokens) / self.rate
+
+    def succeed(self) -> None:
+        """Increase the rate additively after a successful request."""
+        with self._lock:
+            if self.rate is None:
+                return
+            self.rate += self.increase / self.rate
+            if self.max_rate is not None:
+                self.rate = min(self.max_rate, self.rate)
+
+    def throttle(self, pause: Optional[float] = None) -> None:
+        """Decrease the rate multiplicatively and optionally pause.
+
+        Tokens reserved after a pause started wait until it ends, the
+        tokens refilled until now are credited before.
+        """
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            self._refill(now)
+            if self.rate is None:
+                self.rate = max(
+                    self.min_rate, self._get_recent_rate(now) * self.decrease
+                )
+                self._tokens = min(self._tokens, self.burst)
+                self._updated = max(self._updated, now)
+                self._decreased = now
+            elif now - self._decreased >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._decreased = now
+            if pause:
+                resume = now + min(pause, self.max_pause)
+                if resume > self._updated:
+                    self._tokens = min(self._tokens, 0.0)
+                    self._updated = resume
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens refilled since the last update until now."""
+        if self.rate is not None and now > self._updated:
+            refill = (now - self._updated) * self.rate
+            self._tokens = min(self.burst, self._tokens + refill)
+            self._updated = now
+
+    def _get_recent_rate(self, now: float) -> float:
+        """Return requests per second sent without limit recently.
+
+        The requests are counted over at least a second, so a burst of
+        concurrent first requests doesn't count as a huge rate.
+        """
+        if not self._recent:
+            return self.min_rate
+        return len(self._recent) / max(now - self._recent[0], 1.0)
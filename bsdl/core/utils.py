@@ -14,9 +14,23 @@
 """Utilities for beatsaber-playlist-manager."""
 
 import hashlib
+import json
 import logging
+import os
 import re
+import shutil
 
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from .exceptions import ModelError
+
+FICLONE = 0x40049409  # Linux ioctl sharing the data of a file with another
 LOG_LEVELS = {
         "debug": logging.DEBUG,
         "info": logging.INFO,
@@ -26,12 +40,39 @@ LOG_LEVELS = {
     }
 
 
+def get_cache_dir() -> Path:
+    """Return directory for cached data of the current user."""
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "bsdl"
+
+
 def get_checksum(content: bytes) -> str:
     """Return sha256 checksum hex of given content."""
     sha_hash = hashlib.sha256(content)
     return sha_hash.hexdigest()
 
 
+def get_dir_fingerprint(directory: Path) -> Tuple[str, int]:
+    """Return fingerprint of the files in a directory and newest mtime.
+
+    The fingerprint changes whenever a file is added, removed or its
+    size or mtime changes.
+    """
+    sha_hash = hashlib.sha1(usedforsecurity=False)
+    newest = 0
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            stat = entry.stat()
+            newest = max(newest, stat.st_mtime_ns)
+            sha_hash.update(
+                f"{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode()
+            )
+    return sha_hash.hexdigest(), newest
+
+
 def get_file_checksum(filename: str) -> str:
     """Return sha256 checksum of given file content."""
     with open(filename, "rb") as hash_file:
@@ -39,6 +80,44 @@ def get_file_checksum(filename: str) -> str:
     return get_checksum(content)
 
 
+def get_level_dir_hash(directory: Path) -> Optional[str]:
+    """Return BeatSaver hash of an extracted level directory.
+
+    File names are matched case-insensitively like on Windows.
+    """
+    try:
+        names = {name.lower(): name for name in os.listdir(directory)}
+    except OSError as exc:
+        raise ModelError("can't list level directory") from exc
+    return get_level_hash(
+        lambda name: (directory / names.get(name.lower(), name)).read_bytes()
+    )
+
+
+def get_level_hash(read_file: Callable[[str], bytes]) -> Optional[str]:
+    """Return BeatSaver hash of a level from its info and beatmaps.
+
+    The hash is the SHA1 of Info.dat followed by the difficulty files in
+    the order Info.dat lists them. The function read_file returns the
+    content of a file of the level by name. None is returned for info
+    formats without difficulty sets.
+    """
+    try:
+        info = read_file("Info.dat")
+        details = json.loads(info)
+        if not isinstance(details, dict) or (
+            "_difficultyBeatmapSets" not in details
+        ):
+            return None
+        sha_hash = hashlib.sha1(info, usedforsecurity=False)
+        for beatmap_set in details["_difficultyBeatmapSets"]:
+            for beatmap in beatmap_set["_difficultyBeatmaps"]:
+                sha_hash.update(read_file(beatmap["_beatmapFilename"]))
+    except (KeyError, TypeError, ValueError, OSError) as exc:
+        raise ModelError("can't read level info and beatmaps") from exc
+    return sha_hash.hexdigest()
+
+
 def get_logger(name: str, level: str) -> logging.Logger:
     """Create logger for name with stream handler at given log level."""
     fmt = logging.Formatter("%(name)s | %(levelname)-8s |  %(message)s")
@@ -55,3 +134,57 @@ def get_windows_filename(name: str) -> str:
     if any(char in name for char in r'<>:"/\|?*'):
         name = re.sub(r'[<>:"/\\|\?\*]', "", name)
     return name
+
+
+def is_level_hash(lvl_hash: str) -> bool:
+    """Return true if value is a lowercase hex SHA1 level hash."""
+    return re.fullmatch("[0-9a-f]{40}", lvl_hash) is not None
+
+
+def link_file(src: Path, dst: Path) -> None:
+    """Reflink src to dst if supported, else hardlink or copy it."""
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as src_file, open(dst, "xb") as dst_file:
+                fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+            return
+        except OSError:
+            dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def link_tree(src: Path, dst: Path) -> None:
+    """Recreate directory tree of src at dst linking all files.
+
+    Existing files at dst are unlinked first, never written to.
+    """
+    for root, _, files in os.walk(src):
+        dst_root = dst / Path(root).relative_to(src)
+        dst_root.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            (dst_root / name).unlink(missing_ok=True)
+            link_file(Path(root) / name, dst_root / name)
+
+
+def strip_json_string(raw: bytes, key: str) -> bytes:
+    """Return JSON content with the first string value of key emptied.
+
+    Large values like embedded images are cut out with byte searches,
+    which is much faster than decoding them. Content without a string
+    value for the key is returned unchanged.
+    """
+    match = re.search(b'"' + re.escape(key.encode()) + rb'"\s*:\s*"', raw)
+    if match is None:
+        return raw
+    end = raw.find(b'"', match.end())
+    while end != -1:
+        start = end
+        while raw[start - 1] == 0x5C:  # Count backslashes before quote
+            start -= 1
+        if (end - start) % 2 == 0:
+            return raw[:match.end()] + raw[end:]
+        end = raw.find(b'"', end + 1)
+    return raw
@@ -0,0 +1,263 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Persistent library index for beatsaber-playlist-manager."""
+
+import json
+import os
+import time
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .core.database import Database
+from .core.models import BsInvalidLocal, BsPlaylist, HttpValidators, \
+    PlaylistSongs
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS levels (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    filename TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    description TEXT NOT NULL,
+    url TEXT NOT NULL,
+    songs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS level_hashes (
+    name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    hash TEXT
+);
+CREATE TABLE IF NOT EXISTS validators (
+    filename TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+"""
+
+# Modification times this close to the time of indexing are not trusted
+# because the entry could change again within the filesystem's mtime
+# resolution without changing its mtime.
+RACY_NS = 2 * 10 ** 9
+
+
+class LibraryIndex(Database):
+    """SQLite index of the custom levels and playlists of a library.
+
+    Levels are cached by the name of their directory and only rescanned
+    when the mtime of the custom level directory changed. Playlists are
+    cached by filename and only parsed again when the mtime or size of
+    their file changed.
+
+    The HTTP validators of the remote version of a playlist are stored
+    with the checksum of that version. They only apply to the local
+    playlist while its checksum is the same. Level hashes are stored
+    with a fingerprint of the files in the level directory.
+    """
+
+    schema = SCHEMA
+    schema_version = 2
+
+    def get_level_names(
+        self, lvl_dir: Path, scan: Callable[[], Iterable[str]]
+    ) -> List[str]:
+        """Return names of level directories, scanning only if changed.
+
+        If the mtime of the level directory differs from the indexed
+        one, the names returned by scan replace the indexed names.
+        """
+        mtime_ns = lvl_dir.stat().st_mtime_ns
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mtime_ns FROM directories WHERE path = ?",
+                (str(lvl_dir),)
+            ).fetchone()
+            if row is not None and row[0] == mtime_ns:
+                return [
+                    name for (name,) in
+                    self._db.execute("SELECT name FROM levels ORDER BY name")
+                ]
+        names = sorted(scan())
+        with self._lock, self._db:
+            indexed = {
+                name for (name,) in self._db.execute("SELECT name FROM levels")
+            }
+            for statement in (
+                "DELETE FROM levels WHERE name = ?",
+                "DELETE FROM level_hashes WHERE name = ?"
+            ):
+                self._db.executemany(statement, (
+                    (name,) for name in indexed.difference(names)
+                ))
+            self._db.executemany(
+                "INSERT INTO levels (name) VALUES (?)",
+                ((name,) for name in set(names).difference(indexed))
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO directories VALUES (?, ?)",
+                (str(lvl_dir), self._trusted_mtime(mtime_ns))
+            )
+        return names
+
+    def get_playlists(
+        self, files: Iterable[Path],
+        parse: Callable[[List[Path]], List[Union[BsPlaylist, BsInvalidLocal]]]
+    ) -> Tuple[List[BsPlaylist], List[BsInvalidLocal]]:
+        """Return playlists of files, parsing only changed files.
+
+        All changed files are passed to parse at once, which returns a
+        playlist or invalid local playlist for each of them in order.
+        Invalid files aren't indexed. The results keep the file order.
+        """
+        with self._lock:
+            indexed = {
+                row[0]: row for row in
+                self._db.execute("SELECT * FROM playlists")
+            }
+        results: List[Union[BsPlaylist, BsInvalidLocal, None]] = []
+        changed: Dict[Path, Tuple[int, os.stat_result]] = {}
+        for filepath in files:
+            try:
+                stat = filepath.stat()
+            except OSError as exc:
+                results.append(BsInvalidLocal(filepath, exc))
+                continue
+            row = indexed.pop(filepath.name, None)
+            if row is not None and row[1:3] == (
+                stat.st_mtime_ns, stat.st_size
+            ):
+                results.append(self._row_to_playlist(row, filepath))
+                continue
+            changed[filepath] = (len(results), stat)
+            results.append(None)
+        updates = []
+        for (idx, stat), result in zip(
+            changed.values(), parse(list(changed))
+        ):
+            results[idx] = result
+            if isinstance(result, BsPlaylist):
+                updates.append(self._playlist_to_row(result, stat))
+        if updates or indexed:
+            with self._lock, self._db:
+                for statement in (
+                    "DELETE FROM playlists WHERE filename = ?",
+                    "DELETE FROM validators WHERE filename = ?"
+                ):
+                    self._db.executemany(
+                        statement, ((name,) for name in indexed)
+                    )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO playlists "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", updates
+                )
+        return (
+            [bpl for bpl in results if isinstance(bpl, BsPlaylist)],
+            [bpl for bpl in results if isinstance(bpl, BsInvalidLocal)]
+        )
+
+    def get_level_hashes(
+        self, fingerprints: Dict[str, str]
+    ) -> Dict[str, Optional[str]]:
+        """Return hashes of levels whose fingerprint didn't change.
+
+        The fingerprints are given by the name of the level directory.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, fingerprint, hash FROM level_hashes"
+            ).fetchall()
+        return {
+            name: lvl_hash for name, fingerprint, lvl_hash in rows
+            if fingerprints.get(name) == fingerprint
+        }
+
+    def set_level_hashes(
+        self, rows: Iterable[Tuple[str, str, int, Optional[str]]]
+    ) -> None:
+        """Store level hashes by name, fingerprint and newest mtime.
+
+        Hashes of levels with a file modified too recently to be trusted
+        aren't stored.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO level_hashes VALUES (?, ?, ?)", (
+                    (name, fingerprint, lvl_hash)
+                    for name, fingerprint, mtime_ns, lvl_hash in rows
+                    if self._trusted_mtime(mtime_ns) >= 0
+                )
+            )
+
+    def get_validators(self, bpl: BsPlaylist) -> Optional[HttpValidators]:
+        """Return HTTP validators of the remote version of a playlist.
+
+        None is returned if the playlist differs from the version the
+        validators were stored for.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM validators "
+                "WHERE filename = ? AND checksum = ?",
+                (bpl.filename, bpl.checksum)
+            ).fetchone()
+        if row is None:
+            return None
+        return HttpValidators(*row)
+
+    def set_validators(
+        self, filename: str, checksum: str, validators: HttpValidators
+    ) -> None:
+        """Store validators of remote playlist version with checksum."""
+        with self._lock, self._db:
+            if not validators:
+                self._db.execute(
+                    "DELETE FROM validators WHERE filename = ?", (filename,)
+                )
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?)",
+                (filename, checksum, validators.etag, validators.last_modified)
+            )
+
+    def _playlist_to_row(self, bpl: BsPlaylist, stat: os.stat_result) -> tuple:
+        """Return database row for a playlist and its file status."""
+        songs = json.dumps(list(bpl.songs.iter_rows()))
+        return (
+            bpl.filename, self._trusted_mtime(stat.st_mtime_ns),
+            stat.st_size, bpl.checksum, bpl.title, bpl.author,
+            bpl.description, bpl.url, songs
+        )
+
+    @staticmethod
+    def _row_to_playlist(row: tuple, filepath: Path) -> BsPlaylist:
+        """Return playlist constructed from database row."""
+        songs = PlaylistSongs.from_rows(json.loads(row[8]))
+        return BsPlaylist(*row[3:8], songs, None, filepath)
+
+    @staticmethod
+    def _trusted_mtime(mtime_ns: int) -> int:
+        """Return mtime, or -1 if it is too recent to be trusted."""
+        if time.time_ns() - mtime_ns < RACY_NS:
+            return -1
+        return mtime_ns
@@ -13,21 +13,205 @@
 
 """Local BeatSaber functionality for beatsaber-playlist-manager."""
 
+import dataclasses
+import json
 import os
 import shutil
+import tempfile
+import threading
 
-from pathlib import Path
-from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path, PureWindowsPath
+from typing import Any, Callable, Dict, Iterable, Iterator, List, \
+    Optional, Tuple, Union
+from zipfile import BadZipFile, ZipFile
 
 from .core.exceptions import BeatSaberError, ModelError
-from .core.models import BsMap, BsPlaylist, CustomLevel, BsInvalidLocal
+from .core.models import BsMap, BsPlaylist, CustomLevel, BsInvalidLocal, \
+    HttpValidators, PlaylistItem, PlaylistSongs
+from .core.utils import get_dir_fingerprint, get_level_dir_hash, \
+    get_windows_filename, is_level_hash, link_tree
+from .index import LibraryIndex
+from .scanner import LibraryScanner
 
 
-class BeatSaberManager:
+def _read_bpl_fields(filepath: Path) -> Union[tuple, BsInvalidLocal]:
+    """Return fields of playlist in a file or the error reading it.
+
+    The function is defined on module level to be usable in a process
+    pool. Plain tuples are much cheaper to send back than playlists.
+    """
+    try:
+        bpl = BsPlaylist.from_json(filepath.read_bytes(), filepath)
+    except (OSError, ModelError) as exc:
+        return BsInvalidLocal(filepath, exc)
+    return (
+        bpl.checksum, bpl.title, bpl.author, bpl.description, bpl.url,
+        tuple(bpl.songs.iter_rows())
+    )
+
+
+def _hash_level_dir(lvl_dir: Path) -> Union[Optional[str], ModelError]:
+    """Return hash of a level directory or the error reading it.
+
+    The function is defined on module level to be usable in a process
+    pool, the error is returned to not end the pool's map early.
+    """
+    try:
+        return get_level_dir_hash(lvl_dir)
+    except ModelError as exc:
+        return exc
+
+
+class LibrarySnapshot:
+    """In-memory view of installed levels and playlists keyed by key.
+
+    The snapshot is read from disk once and has to be kept up to date
+    by whatever installs or removes levels and playlists. Levels are
+    identified by their directory and playlists by their filename, so
+    several of them can share a key. Lookups by key return the first.
+    Playlist membership of songs is answered from an inverted index of
+    song keys to playlists.
+    """
+
+    def __init__(
+        self, levels: List[CustomLevel], playlists: List[BsPlaylist],
+        invalid_playlists: List[BsInvalidLocal]
+    ) -> None:
+        """Create snapshot from levels and playlists of a library."""
+        self._lock = threading.Lock()
+        self._levels: Dict[Path, CustomLevel] = {}
+        self._level_keys: Dict[str, Dict[Path, None]] = {}
+        self._playlists: Dict[str, BsPlaylist] = {}
+        self._playlist_keys: Dict[str, Dict[str, None]] = {}
+        self._song_playlists: Dict[str, Dict[str, None]] = {}
+        self.invalid_playlists = invalid_playlists
+        for lvl in levels:
+            self._add_level(lvl)
+        for bpl in playlists:
+            self._add_playlist(bpl)
+
+    @property
+    def levels(self) -> List[CustomLevel]:
+        """Return list with all installed levels."""
+        with self._lock:
+            return list(self._levels.values())
+
+    @property
+    def playlists(self) -> List[BsPlaylist]:
+        """Return list with all installed playlists."""
+        with self._lock:
+            return list(self._playlists.values())
+
+    def get_playlists(
+        self
+    ) -> Tuple[List[BsPlaylist], List[BsInvalidLocal]]:
+        """Return installed playlists and unreadable playlist files."""
+        return self.playlists, list(self.invalid_playlists)
+
+    def get_level(self, key: str) -> Optional[CustomLevel]:
+        """Return installed level for key if it exists."""
+        with self._lock:
+            for directory in self._level_keys.get(key, ()):
+                return self._levels[directory]
+        return None
+
+    def get_playlist(self, key: str) -> Optional[BsPlaylist]:
+        """Return installed playlist for key if it exists."""
+        with self._lock:
+            for filename in self._playlist_keys.get(key, ()):
+                return self._playlists[filename]
+        return None
+
+    def get_song_playlists(self, key: str) -> List[BsPlaylist]:
+        """Return installed playlists that contain the song with key."""
+        with self._lock:
+            return [
+                self._playlists[filename]
+                for filename in self._song_playlists.get(key, ())
+            ]
+
+    def is_in_playlist(self, key: str, exclude: Optional[str] = None) -> bool:
+        """Return true if an installed playlist contains the song.
+
+        Playlists with the key given as exclude are ignored.
+        """
+        with self._lock:
+            return any(
+                self._playlists[filename].key != exclude
+                for filename in self._song_playlists.get(key, ())
+            )
+
+    def add_level(self, lvl: CustomLevel) -> None:
+        """Add or replace an installed level."""
+        with self._lock:
+            self._add_level(lvl)
+
+    def remove_level(self, lvl: CustomLevel) -> None:
+        """Remove an installed level."""
+        with self._lock:
+            if self._levels.pop(lvl.directory, None) is not None:
+                del self._level_keys[lvl.key][lvl.directory]
+                if not self._level_keys[lvl.key]:
+                    del self._level_keys[lvl.key]
+
+    def add_playlist(self, bpl: BsPlaylist) -> None:
+        """Add or replace an installed playlist."""
+        with self._lock:
+            self._remove_playlist(bpl.filename)
+            self._add_playlist(bpl)
+
+    def remove_playlist(self, bpl: BsPlaylist) -> None:
+        """Remove an installed playlist."""
+        with self._lock:
+            installed = self._playlists.get(bpl.filename)
+            if installed is not None and installed.filepath == bpl.filepath:
+                self._remove_playlist(bpl.filename)
+
+    def _add_level(self, lvl: CustomLevel) -> None:
+        """Add level to all mappings."""
+        self._levels[lvl.directory] = lvl
+        self._level_keys.setdefault(lvl.key, {})[lvl.directory] = None
+
+    def _add_playlist(self, bpl: BsPlaylist) -> None:
+        """Add playlist to all mappings."""
+        self._playlists[bpl.filename] = bpl
+        self._playlist_keys.setdefault(bpl.key, {})[bpl.filename] = None
+        for song in bpl.songs:
+            self._song_playlists.setdefault(song.key, {})[bpl.filename] = None
+
+    def _remove_playlist(self, filename: str) -> None:
+        """Remove playlist with filename from all mappings."""
+        bpl = self._playlists.pop(filename, None)
+        if bpl is None:
+            return
+        del self._playlist_keys[bpl.key][filename]
+        if not self._playlist_keys[bpl.key]:
+            del self._playlist_keys[bpl.key]
+        for song in bpl.songs:
+            filenames = self._song_playlists.get(song.key, {})
+            filenames.pop(filename, None)
+            if not filenames:
+                self._song_playlists.pop(song.key, None)
+
+
+# pylint: disable-next=too-many-public-methods
+class BeatSaberManager:  # pylint: disable=too-many-instance-attributes
     """Base for interacting with a local BeatSaber installation."""
 
-    def __init__(self, directory: Path) -> None:
-        """Init manager for BeatSaber installation at given location."""
+    def __init__(
+        self, directory: Path, use_index: bool = True,
+        level_pool: Optional[Path] = None, scan_threads: int = 0
+    ) -> None:
+        """Init manager for BeatSaber installation at given location.
+
+        Unless disabled the levels and playlists are cached in an index
+        stored in the UserData directory of the installation. If a level
+        pool is given, custom levels are extracted into it once and
+        linked into the installation. Scan threads above zero scan the
+        library in parallel, which helps on network filesystems.
+        """
         self.playlist_ext = ".bplist"
         self.default_songs = (  # Contains levels auto-generated by Mod
             "Jaroslav Beck - Beat Saber (Built in)",
@@ -45,26 +229,77 @@ class BeatSaberManager:
             except PermissionError as exc:
                 err = f"access to directory denied: {bs_dir}"
                 raise BeatSaberError(err) from exc
+        self.level_pool = level_pool
+        self.scanner = LibraryScanner(scan_threads)
+        self.parse_jobs = 1
+        self.min_files_per_job = 16  # Smaller pools cost more than they save
+        self.min_levels_per_job = 16  # Same for hashing levels
+        self.songcore_hashes = (
+            directory / "UserData" / "SongCore" / "SongHashData.dat"
+        )
+        self._snapshot: Optional[LibrarySnapshot] = None
+        self.index: Optional[LibraryIndex] = None
+        if use_index:
+            self.index = LibraryIndex.open(
+                directory / "UserData" / "bsdl.sqlite"
+            )
+
+    @property
+    def snapshot(self) -> LibrarySnapshot:
+        """Return snapshot of the library, read when first used."""
+        if self._snapshot is None:
+            self._snapshot = LibrarySnapshot(
+                self.get_custom_levels(), *self.get_playlists()
+            )
+        return self._snapshot
 
     def get_bpl_files(self) -> List[Path]:
         """Return list of all bplist filepaths of given installation."""
-        return [
-            bpl.resolve() for bpl in self.bpl_dir.iterdir()
-            if bpl.is_file() and bpl.suffix == self.playlist_ext
-        ]
+        return list(self.iter_bpl_files())
+
+    def iter_bpl_files(self) -> Iterator[Path]:
+        """Yield bplist filepaths while scanning playlist directory."""
+        bpl_dir = self.bpl_dir.resolve()
+        for name in self.scanner.iter_file_names(bpl_dir, self.playlist_ext):
+            yield bpl_dir / name
 
     def get_playlists(self) -> Tuple[List[BsPlaylist], List[BsInvalidLocal]]:
         """Return list with all playlists of given installation."""
         playlist_files = self.get_bpl_files()
-        bplists = []
-        invalids = []
-        for playlist in playlist_files:
-            try:
-                content = playlist.read_bytes()
-                bplists.append(BsPlaylist.from_json(content, playlist))
-            except (OSError, ModelError) as exc:
-                invalids.append(BsInvalidLocal(playlist, exc))
-        return bplists, invalids
+        if self.index is not None:
+            return self.index.get_playlists(playlist_files, self.read_bpls)
+        results = self.read_bpls(playlist_files)
+        return (
+            [bpl for bpl in results if isinstance(bpl, BsPlaylist)],
+            [bpl for bpl in results if isinstance(bpl, BsInvalidLocal)]
+        )
+
+    @staticmethod
+    def read_bpl(filepath: Path) -> BsPlaylist:
+        """Return playlist parsed from given file."""
+        return BsPlaylist.from_json(filepath.read_bytes(), filepath)
+
+    def read_bpls(
+        self, files: List[Path]
+    ) -> List[Union[BsPlaylist, BsInvalidLocal]]:
+        """Return playlist or invalid local playlist for files in order.
+
+        With parse jobs above one, enough files are parsed by a pool of
+        processes, at most one per CPU. The json content isn't kept, it
+        is read from the file again when needed.
+        """
+        jobs = self._get_process_jobs(
+            self.parse_jobs, len(files), self.min_files_per_job
+        )
+        if jobs <= 1:
+            return [self._read_bpl_or_invalid(bpl) for bpl in files]
+        return [
+            fields if isinstance(fields, BsInvalidLocal) else BsPlaylist(
+                *fields[:5], PlaylistSongs.from_rows(fields[5]), None, filepath
+            ) for filepath, fields in zip(
+                files, self._map_processes(_read_bpl_fields, files, jobs)
+            )
+        ]
 
     def get_playlist_names(self) -> List[str]:
         """Return list with all playlist names of given installation."""
@@ -72,66 +307,346 @@ class BeatSaberManager:
 
     def get_playlist_by_key(self, key: str) -> Optional[BsPlaylist]:
         """Return playlist for given key if it exists."""
-        for bplist in self.get_playlists()[0]:
-            if bplist.key == key:
-                return bplist
-        return None
+        return self.snapshot.get_playlist(key)
+
+    def get_playlist_validators(
+        self, bpl: BsPlaylist
+    ) -> Optional[HttpValidators]:
+        """Return stored HTTP validators of an installed playlist."""
+        if self.index is None:
+            return None
+        return self.index.get_validators(bpl)
+
+    def set_playlist_validators(
+        self, bpl: BsPlaylist, remote_bpl: BsPlaylist,
+        validators: HttpValidators
+    ) -> None:
+        """Store HTTP validators of the remote version of a playlist.
+
+        They apply to the installed playlist as long as its content is
+        the one of the remote version.
+        """
+        if self.index is not None:
+            self.index.set_validators(
+                bpl.filename, remote_bpl.checksum, validators
+            )
 
     def remove_playlist(self, bpl: BsPlaylist) -> None:
-        """Remove given playlist file."""  # pylint: disable=no-self-use
+        """Remove given playlist file."""
         try:
             bpl.filepath.unlink()
         except OSError as exc:
             err_msg = f"can't remove playlist file: {exc.args[0]}"
             raise BeatSaberError(err_msg) from exc
+        if self._snapshot is not None:
+            self._snapshot.remove_playlist(bpl)
 
     def install_playlist(self, bpl: BsPlaylist) -> None:
         """Write JSON playlist content to file in playlist directory."""
         bpl_dest = self.bpl_dir / bpl.filename
         try:
-            bpl_dest.write_bytes(bpl.json_raw)
+            bpl_dest.write_bytes(bpl.get_json_raw())
+        except ModelError as exc:
+            raise BeatSaberError(f"can't read playlist: {exc}") from exc
         except OSError as exc:
             err_msg = f"can't write playlist content: {exc.args[0]}"
             raise BeatSaberError(err_msg) from exc
+        if self._snapshot is not None:
+            self._snapshot.add_playlist(
+                dataclasses.replace(
+                    bpl, json_raw=None, filepath=bpl_dest.resolve()
+                )
+            )
 
     def get_custom_lvl_dirs(self) -> List[Path]:
         """Return list with all custom level directories."""
-        return [
-            lvl.resolve() for lvl in self.custom_lvl_dir.iterdir()
-            if lvl.is_dir() and lvl.name not in self.default_songs
-        ]
+        return list(self.iter_custom_lvl_dirs())
+
+    def iter_custom_lvl_dirs(self) -> Iterator[Path]:
+        """Yield custom level directories, scanning only if needed.
+
+        Without index the directories are yielded while scanning.
+        """
+        lvl_dir = self.custom_lvl_dir.resolve()
+        scan = partial(
+            self.scanner.iter_dir_names, lvl_dir, self.default_songs
+        )
+        names: Iterable[str] = scan() if self.index is None else (
+            self.index.get_level_names(lvl_dir, scan)
+        )
+        for name in names:
+            yield lvl_dir / name
 
     def get_custom_levels(self) -> List[CustomLevel]:
         """Return keys of all installed songs from directory names."""
-        return [CustomLevel(lvl) for lvl in self.get_custom_lvl_dirs()]
+        return list(self.iter_custom_levels())
+
+    def iter_custom_levels(self) -> Iterator[CustomLevel]:
+        """Yield installed custom levels while scanning directory."""
+        for lvl_dir in self.iter_custom_lvl_dirs():
+            yield CustomLevel(lvl_dir)
 
     def get_custom_level_by_key(self, key: str) -> Optional[CustomLevel]:
         """Return custom level for given key if it exists."""
-        for lvl in self.get_custom_levels():
-            if not isinstance(lvl, CustomLevel):
+        return self.snapshot.get_level(key)
+
+    def get_level_hashes(
+        self, lvls: List[CustomLevel], jobs: int = 1
+    ) -> Tuple[Dict[str, Optional[str]], List[BsInvalidLocal]]:
+        """Return BeatSaver hashes of levels and unreadable levels.
+
+        The hashes are returned by name of the level directory. Enough
+        levels are hashed by a pool of at most one process per CPU. The
+        hashes are taken from the index while the files of a level
+        don't change. Hashes that SongCore recorded after the files of a
+        level last changed are taken from its hash data. Levels in an
+        info format without difficulty sets have None as hash.
+        """
+        fingerprints: Dict[str, Tuple[str, int]] = {}
+        invalids = []
+        for lvl, fingerprint in zip(lvls, self.scanner.map(
+            self._get_fingerprint, (lvl.directory for lvl in lvls)
+        )):
+            if isinstance(fingerprint, OSError):
+                invalids.append(BsInvalidLocal(lvl.directory, fingerprint))
+            else:
+                fingerprints[lvl.directory.name] = fingerprint
+        hashes = {}
+        if self.index is not None:
+            hashes = self.index.get_level_hashes({
+                name: fingerprint
+                for name, (fingerprint, _) in fingerprints.items()
+            })
+        todo = [
+            lvl.directory for lvl in lvls
+            if lvl.directory.name in fingerprints
+            and lvl.directory.name not in hashes
+        ]
+        rows = self._get_songcore_rows({
+            lvl_dir.name: fingerprints[lvl_dir.name] for lvl_dir in todo
+        }) if todo else []
+        hashes.update((row[0], row[3]) for row in rows)
+        todo = [lvl_dir for lvl_dir in todo if lvl_dir.name not in hashes]
+        jobs = self._get_process_jobs(
+            jobs, len(todo), self.min_levels_per_job
+        )
+        for lvl_dir, result in zip(
+            todo, self._map_processes(_hash_level_dir, todo, jobs)
+        ):
+            if isinstance(result, ModelError):
+                invalids.append(BsInvalidLocal(lvl_dir, result))
                 continue
-            if lvl.key == key:
-                return lvl
-        return None
+            hashes[lvl_dir.name] = result
+            rows.append((lvl_dir.name, *fingerprints[lvl_dir.name], result))
+        if self.index is not None and rows:
+            self.index.set_level_hashes(rows)
+        return hashes, invalids
+
+    def read_songcore_hashes(self) -> Tuple[Dict[str, str], int]:
+        """Return level hashes recorded by SongCore and their mtime.
+
+        The hashes are returned by name of the directory of levels in
+        CustomLevels. Without readable hash data the result is empty.
+        """
+        try:
+            mtime_ns = self.songcore_hashes.stat().st_mtime_ns
+            with open(self.songcore_hashes, "rb") as hash_data:
+                entries = json.load(hash_data)
+            hashes = {}
+            for path, entry in entries.items():
+                lvl_dir = PureWindowsPath(path)
+                lvl_hash = str(entry["songHash"]).lower()
+                if lvl_dir.parent.name == "CustomLevels" and (
+                    is_level_hash(lvl_hash)
+                ):
+                    hashes[lvl_dir.name] = lvl_hash
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}, 0
+        return hashes, mtime_ns
 
     def remove_custom_level(self, lvl: CustomLevel) -> None:
-        """Remove level directory."""  # pylint: disable=no-self-use
+        """Remove level directory.
+
+        Files linked from the level pool are only unlinked, so other
+        installations keep them. Levels inside the pool aren't removed.
+        """
+        if self.level_pool is not None and lvl.directory.resolve(
+        ).is_relative_to(self.level_pool.resolve()):
+            raise BeatSaberError("level is part of the shared level pool")
         try:
             shutil.rmtree(lvl.directory)
         except OSError as exc:
             err_msg = f"can't remove custom level: {exc.args[0]}"
             raise BeatSaberError(err_msg) from exc
+        if self._snapshot is not None:
+            self._snapshot.remove_level(lvl)
 
     def install_custom_level(self, lvl: BsMap) -> None:
-        """Extract the zipped custom level contents to lvl directory."""
+        """Extract the zipped custom level contents to lvl directory.
+
+        The file holding the zipped contents is closed afterwards. With
+        a level pool, levels with a hash are extracted into the pool if
+        they aren't there yet and their files are linked from it.
+        """
         if lvl.content is None:
             raise BeatSaberError("level has no content")
         lvl_path = self.custom_lvl_dir / lvl.directory
+        pool_path = self._get_pool_path(lvl)
+        if pool_path is None:
+            self._extract_level(lvl, lvl_path)
+        else:
+            self._install_pooled_level(lvl, lvl_path, pool_path)
+        if self._snapshot is not None:
+            self._snapshot.add_level(CustomLevel(lvl_path.resolve()))
+
+    def get_partial_download_path(
+        self, lvl: Union[BsMap, PlaylistItem]
+    ) -> Path:
+        """Return path of the partial download of a level's zip.
+
+        The name holds the level hash if known, so a partial download
+        of another version of the level is never continued.
+        """
+        name = f"{lvl.key} ({lvl.name})"
+        if lvl.hash:
+            name += f" {lvl.hash.lower()}"
+        return self.custom_lvl_dir / get_windows_filename(f"{name}.zip.part")
+
+    @staticmethod
+    def _get_fingerprint(
+        lvl_dir: Path
+    ) -> Union[Tuple[str, int], OSError]:
+        """Return fingerprint of a level directory or the error."""
+        try:
+            return get_dir_fingerprint(lvl_dir)
+        except OSError as exc:
+            return exc
+
+    def _get_pool_path(self, lvl: BsMap) -> Optional[Path]:
+        """Return directory of level in the pool, None without pool."""
+        if self.level_pool is None or lvl.hash is None:
+            return None
+        lvl_hash = lvl.hash.lower()
+        if not is_level_hash(lvl_hash):
+            return None
+        return self.level_pool / lvl_hash
+
+    def _get_songcore_rows(
+        self, fingerprints: Dict[str, Tuple[str, int]]
+    ) -> List[Tuple[str, str, int, str]]:
+        """Return index rows of levels with up to date SongCore hashes.
+
+        A hash is up to date if all files of the level are older than
+        the hash data of SongCore.
+        """
+        songcore, recorded_ns = self.read_songcore_hashes()
+        return [
+            (name, fingerprint, newest_ns, songcore[name])
+            for name, (fingerprint, newest_ns) in fingerprints.items()
+            if name in songcore and newest_ns < recorded_ns
+        ]
+
+    def _install_pooled_level(
+        self, lvl: BsMap, lvl_path: Path, pool_path: Path
+    ) -> None:
+        """Link files of level into lvl directory from the pool.
+
+        A level missing from the pool or not matching its hash there is
+        extracted into a temporary directory that is renamed to its
+        place in the pool, so other processes never link a partially
+        extracted level. A mismatching level is moved aside first.
+        """
+        if self._is_pooled(pool_path):
+            lvl.content.close()
+        else:
+            try:
+                self.level_pool.mkdir(parents=True, exist_ok=True)
+                part_path = Path(
+                    tempfile.mkdtemp(suffix=".part", dir=self.level_pool)
+                )
+            except OSError as exc:
+                err_msg = f"can't create level in pool: {exc.args[0]}"
+                raise BeatSaberError(err_msg) from exc
+            stale_path = part_path.with_suffix(".stale")
+            try:
+                self._extract_level(lvl, part_path)
+                if pool_path.is_dir():
+                    os.replace(pool_path, stale_path)
+                os.replace(part_path, pool_path)
+            except OSError:
+                pass  # Another process added the level to the pool first
+            finally:
+                shutil.rmtree(part_path, ignore_errors=True)
+                shutil.rmtree(stale_path, ignore_errors=True)
+            if not pool_path.is_dir():
+                raise BeatSaberError("can't add level to pool")
+        try:
+            link_tree(pool_path, lvl_path)
+        except OSError as exc:
+            err_msg = f"can't link level from pool: {exc.args[0]}"
+            raise BeatSaberError(err_msg) from exc
+
+    @staticmethod
+    def _is_pooled(pool_path: Path) -> bool:
+        """Return true if pool holds a level matching its hash.
+
+        Pooled levels are named after their hash. Levels whose info
+        format has no hash are taken as they are.
+        """
+        if not pool_path.is_dir():
+            return False
+        try:
+            pooled_hash = get_level_dir_hash(pool_path)
+        except ModelError:
+            return False
+        return pooled_hash is None or pooled_hash == pool_path.name
+
+    @staticmethod
+    def _get_process_jobs(jobs: int, items: int, min_items: int) -> int:
+        """Return number of processes worth using for items.
+
+        Every process gets at least min_items items and there are no
+        more processes than CPUs, as the work is bound by the CPU.
+        """
+        return min(jobs, os.cpu_count() or 1, items // min_items)
+
+    @staticmethod
+    def _map_processes(
+        func: Callable[[Any], Any], items: List[Any], jobs: int
+    ) -> List[Any]:
+        """Return results of func for items from a pool of processes.
+
+        Without more than one job or item the items are processed in
+        the current process.
+        """
+        if jobs <= 1 or len(items) <= 1:
+            return list(map(func, items))
+        workers = min(jobs, len(items))
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(
+                func, items, chunksize=max(1, len(items) // (4 * workers))
+            ))
+
+    @classmethod
+    def _read_bpl_or_invalid(
+        cls, filepath: Path
+    ) -> Union[BsPlaylist, BsInvalidLocal]:
+        """Return playlist read from file or the reading error."""
+        try:
+            return cls.read_bpl(filepath)
+        except (OSError, ModelError) as exc:
+            return BsInvalidLocal(filepath, exc)
+
+    @staticmethod
+    def _extract_level(lvl: BsMap, lvl_path: Path) -> None:
+        """Extract the zipped content of level into given directory."""
         try:
-            lvl.content.extractall(lvl_path)
+            with lvl.content, ZipFile(lvl.content) as lvl_zip:
+                lvl_zip.extractall(lvl_path)
+        except BadZipFile as exc:
+            raise BeatSaberError("level content is not a valid zip") from exc
         except OSError as exc:
-            if lvl_path.exists():
-                lvl_path.unlink()
+            shutil.rmtree(lvl_path, ignore_errors=True)
             err_msg = f"can't extract level content: {exc.args[0]}"
             raise BeatSaberError(err_msg) from exc
 
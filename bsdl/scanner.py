@@ -0,0 +1,79 @@
+##
+#   Copyright (c) 2022 Valentin Weber
+#
+#   This file is part of the software beatsaver-playlist-manager.
+#
+#   The software is licensed under the European Union Public License
+#   (EUPL) version 1.2 or later. You should have received a copy of
+#   the english license text with the software. For your rights and
+#   obligations under this license refer to the file LICENSE or visit
+#   https://joinup.ec.europa.eu/community/eupl/og_page/eupl to view
+#   official translations of the licence in another language of the EU.
+##
+
+"""Library directory scanning for beatsaber-playlist-manager."""
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Container, Iterable, Iterator
+
+
+class LibraryScanner:
+    """Scanner listing library directories with os.scandir.
+
+    The type of an entry is taken from the directory listing where the
+    filesystem reports it, which saves a stat call per entry. With
+    threads set, remaining stat calls and other work per entry run in a
+    thread pool to hide the latency of network filesystems.
+    """
+
+    def __init__(self, threads: int = 0) -> None:
+        """Create scanner, it runs in the calling thread by default."""
+        self.threads = threads
+
+    def iter_dir_names(
+        self, directory: Path, exclude: Container[str] = ()
+    ) -> Iterator[str]:
+        """Yield names of subdirectories that aren't excluded."""
+        for entry in self.iter_entries(
+            directory, lambda entry: entry.name not in exclude
+            and entry.is_dir()
+        ):
+            yield entry.name
+
+    def iter_file_names(self, directory: Path, suffix: str) -> Iterator[str]:
+        """Yield names of files in directory with the given suffix."""
+        for entry in self.iter_entries(
+            directory, lambda entry: os.path.splitext(entry.name)[1] == suffix
+            and entry.is_file()
+        ):
+            yield entry.name
+
+    def iter_entries(
+        self, directory: Path, is_wanted: Callable[[os.DirEntry], bool]
+    ) -> Iterator[os.DirEntry]:
+        """Yield entries of directory that is_wanted returns true for.
+
+        Without threads entries are yielded while the directory is
+        read, otherwise it is read completely before checking entries.
+        """
+        with os.scandir(directory) as entries:
+            if self.threads <= 0:
+                yield from filter(is_wanted, entries)
+                return
+            listed = list(entries)
+        for entry, wanted in zip(listed, self.map(is_wanted, listed)):
+            if wanted:
+                yield entry
+
+    def map(
+        self, func: Callable[[Any], Any], items: Iterable[Any]
+    ) -> Iterator[Any]:
+        """Yield results of func for items in order of the items."""
+        if self.threads <= 0:
+            yield from map(func, items)
+            return
+        with ThreadPoolExecutor(self.threads) as pool:
+            yield from pool.map(func, items)
@@ -78,9 +78,10 @@ if __name__ == '__main__':
         long_description=README,
         long_description_content_type="text/markdown",
         version=VERSION,
-        packages=find_packages(),
+        packages=find_packages(exclude=["benchmarks"]),
         include_package_data=True,
         install_requires=REQUIREMENTS,
+        extras_require={"async": ["aiohttp"]},
         license="EUPL",
         url=GITHUB,
         author="Valentin Weber",